@@ -1,13 +1,108 @@
+import functools
+import importlib
+from typing import Callable, Dict, Optional, Tuple
+
 import streamlit as st
 from pathlib import Path
 
 from model import MATERIAL_CATEGORIES
 
-# Page renderers
-from pages.home import render as render_home
-from pages.cost import render as render_cost_placeholder
-from pages.materials import render_placeholder
-from pages.materials_silver import render as render_silver_ribbon
+# ---------------------------------------------------
+# Page routes: sidebar label -> page module (imported lazily)
+# ---------------------------------------------------
+TOP_ROUTES = {
+    "Home": "pages.home",
+    "Array Designs": "pages.array_designs",
+    "Labour": "pages.cost_labour",
+}
+
+MATERIAL_ROUTES = {
+    "Silver Ribbon": "pages.materials_silver",
+    "Diodes": "pages.materials_diodes",
+    "Weld heads": "pages.materials_weld_heads",
+    "Lamination": "pages.materials_lamination",
+    "Tapes": "pages.materials_tapes",
+    "Misc": "pages.materials_misc",
+    "Packaging": "pages.materials_packaging",
+}
+
+# Order here is the order of the Cost submenu
+COST_ROUTES = {
+    "Summary": "pages.cost_summary",
+    "Silver": "pages.cost_silver",
+    "Diodes": "pages.cost_diodes",
+    "Weld heads": "pages.cost_weld_heads",
+    "Lamination": "pages.cost_lamination",
+    "Tapes": "pages.cost_tapes",
+    "Misc": "pages.cost_misc",
+    "Packaging": "pages.cost_packaging",
+}
+
+
+def _lazy_render(module_name: str) -> None:
+    importlib.import_module(module_name).render()
+
+
+def _make_router() -> Dict[Tuple[str, Optional[str]], Callable[[], None]]:
+    """
+    Flatten the route tables into one (main_page, section) -> renderer map.
+
+    Built once at import; top-level pages use section None.
+    """
+    router: Dict[Tuple[str, Optional[str]], Callable[[], None]] = {}
+    for page, module_name in TOP_ROUTES.items():
+        router[(page, None)] = functools.partial(_lazy_render, module_name)
+    for section, module_name in MATERIAL_ROUTES.items():
+        router[("Materials", section)] = functools.partial(_lazy_render, module_name)
+    for section, module_name in COST_ROUTES.items():
+        router[("Cost", section)] = functools.partial(_lazy_render, module_name)
+    return router
+
+
+_ROUTER = _make_router()
+
+
+def _render_fallback(main_page: str, section: Optional[str]) -> None:
+    """Placeholder pages for anything without a route."""
+    if main_page == "Materials":
+        from pages.materials import render_placeholder
+        render_placeholder(section or "Unknown")
+    elif main_page == "Cost":
+        from pages.cost import render as render_cost_placeholder
+        render_cost_placeholder()
+    else:
+        st.error("Unknown page selected.")
+
+# ---------------------------------------------------
+# Sidebar CSS (emitted once per rerun)
+# ---------------------------------------------------
+# - hide Streamlit's default multipage navigation
+# - deep blue sidebar with white text
+# - light indentation for submenu items
+_SIDEBAR_CSS = """
+<style>
+section[data-testid="stSidebarNav"],
+div[data-testid="stSidebarNav"] {
+    display: none !important;
+}
+[data-testid="stSidebar"] {
+    background-color: #000065;
+}
+[data-testid="stSidebar"] * {
+    color: white !important;
+}
+.cost-submenu {
+    padding-left: 15px !important;
+}
+</style>
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def _logo_bytes() -> Optional[bytes]:
+    """Sidebar logo, read from disk once per process (None if missing)."""
+    logo_path = Path(__file__).parent / "logo.png"
+    return logo_path.read_bytes() if logo_path.exists() else None
 
 
 def main() -> None:
@@ -21,50 +116,18 @@ def main() -> None:
     )
 
     # ---------------------------------------------------
-    # Hide Streamlit's default multipage navigation
-    # ---------------------------------------------------
-    st.markdown(
-        """
-        <style>
-        section[data-testid="stSidebarNav"],
-        div[data-testid="stSidebarNav"] {
-            display: none !important;
-        }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
-
-    # ---------------------------------------------------
-    # Custom sidebar styling (deep blue, white text)
+    # Hide default multipage nav + custom sidebar styling
     # ---------------------------------------------------
-    st.markdown(
-        """
-        <style>
-        [data-testid="stSidebar"] {
-            background-color: #000065;
-        }
-        [data-testid="stSidebar"] * {
-            color: white !important;
-        }
-
-        /* Light indentation for submenu items */
-        .cost-submenu {
-            padding-left: 15px !important;
-        }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+    st.markdown(_SIDEBAR_CSS, unsafe_allow_html=True)
 
     # ---------------------------------------------------
     # SIDEBAR CONTENT
     # ---------------------------------------------------
     with st.sidebar:
         # Logo
-        logo_path = Path("logo.png")
-        if logo_path.exists():
-            st.image(str(logo_path), use_container_width=True)
+        logo = _logo_bytes()
+        if logo:
+            st.image(logo, use_container_width=True)
 
         st.markdown("---")
         st.title("Navigation")
@@ -90,16 +153,7 @@ def main() -> None:
         if main_page == "Cost":
             cost_section = st.radio(
                 "Cost breakdown",
-                (
-                    "Summary",
-                    "Silver",
-                    "Diodes",
-                    "Weld heads",
-                    "Lamination",
-                    "Tapes",
-                    "Misc",
-                    "Packaging",
-                ),
+                tuple(COST_ROUTES),
                 index=0,
                 key="cost_submenu",
             )
@@ -107,81 +161,12 @@ def main() -> None:
     # ---------------------------------------------------
     # MAIN CONTENT ROUTING
     # ---------------------------------------------------
-    if main_page == "Home":
-        render_home()
-
-    elif main_page == "Array Designs":
-        from pages.array_designs import render as render_array_designs
-        render_array_designs()
-
-    elif main_page == "Materials":
-        if material_section == "Silver Ribbon":
-            render_silver_ribbon()
-        elif material_section == "Diodes":
-            from pages.materials_diodes import render as render_diodes
-            render_diodes()
-        elif material_section == "Weld heads":
-            from pages.materials_weld_heads import render as render_weld_heads
-            render_weld_heads()
-        elif material_section == "Lamination":
-            from pages.materials_lamination import render as render_lamination
-            render_lamination()
-        elif material_section == "Tapes":
-            from pages.materials_tapes import render as render_tapes
-            render_tapes()
-        elif material_section == "Misc":
-            from pages.materials_misc import render as render_misc
-            render_misc()
-        elif material_section == "Packaging":
-            from pages.materials_packaging import render as render_packaging
-            render_packaging()
-        else:
-            render_placeholder(material_section or "Unknown")
-
-    elif main_page == "Cost":
-        # Summary (default)
-        if cost_section == "Summary":
-            from pages.cost_summary import render as render_cost_summary
-            render_cost_summary()
-
-        elif cost_section == "Silver":
-            from pages.cost_silver import render as render_cost_silver
-            render_cost_silver()
-
-        elif cost_section == "Diodes":
-            from pages.cost_diodes import render as render_cost_diodes
-            render_cost_diodes()
-
-        elif cost_section == "Weld heads":
-            from pages.cost_weld_heads import render as render_cost_weld
-            render_cost_weld()
-
-        elif cost_section == "Lamination":
-            from pages.cost_lamination import render as render_cost_lamination
-            render_cost_lamination()
-
-        elif cost_section == "Tapes":
-            from pages.cost_tapes import render as render_cost_tapes
-            render_cost_tapes()
-
-        elif cost_section == "Misc":
-            from pages.cost_misc import render as render_cost_misc
-            render_cost_misc()
-
-        elif cost_section == "Packaging":
-            from pages.cost_packaging import render as render_cost_packaging
-            render_cost_packaging()
-
-        else:
-            render_cost_placeholder(cost_section or "Unknown")
-
-    elif main_page == "Labour":
-        from pages.cost_labour import render as render_labour
-        render_labour()
-
+    section = material_section if main_page == "Materials" else cost_section
+    render_page = _ROUTER.get((main_page, section))
+    if render_page is None:
+        _render_fallback(main_page, section)
     else:
-        st.error("Unknown page selected.")
-
+        render_page()
 
 if __name__ == "__main__":
     main()
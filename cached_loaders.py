@@ -0,0 +1,167 @@
+from pathlib import Path
+from typing import Dict, List
+
+import streamlit as st
+
+import labour_model
+import model
+from labour_model import OperatorProfile
+from model import ArrayDesign, ArrayDesignRec, MaterialsDB, Product
+
+# ============================================================
+# STREAMLIT-CACHED LOADERS
+# ============================================================
+# model.py and labour_model.py stay Streamlit-free; pages that only *read*
+# data go through these wrappers instead. Each cached function is keyed on
+# the file's mtime, so an edit on disk (or a save_* from another page)
+# naturally produces a cache miss on the next rerun. st.cache_data hands
+# back a fresh copy on every call, so callers may still mutate the result.
+
+
+def file_mtime_ns(path: Path) -> int:
+    """File mtime in ns, or 0 if the file doesn't exist (yet)."""
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _product(mtime_ns: int) -> Product:
+    return model.load_product()
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _materials(mtime_ns: int) -> MaterialsDB:
+    return model.load_materials()
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _materials_index(mtime_ns: int) -> Dict[str, dict]:
+    index: Dict[str, dict] = {}
+    for category, items in _materials(mtime_ns).items():
+        by_type: Dict[str, list] = {}
+        by_id: Dict[str, dict] = {}
+        for item in items:
+            by_type.setdefault(str(item.get("type", "")).lower(), []).append(item)
+            by_id.setdefault(item.get("id"), item)  # first item with an id wins
+        index[category] = {"items": items, "by_type": by_type, "by_id": by_id}
+    return index
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _foam_positions_by_thickness(mtime_ns: int) -> Dict[float, int]:
+    foams = _materials_index(mtime_ns)["Packaging"]["by_type"].get("foam", [])
+    by_thickness: Dict[float, int] = {}
+    for pos, foam in enumerate(foams):
+        try:
+            thickness_mm = float(foam.get("thickness_mm", 0.0))
+        except (TypeError, ValueError):
+            continue
+        by_thickness[round(thickness_mm, 3)] = pos  # last foam of a thickness wins
+    return by_thickness
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _array_designs(mtime_ns: int) -> List[ArrayDesign]:
+    return model.load_array_designs()
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _array_designs_by_name(mtime_ns: int) -> Dict[str, ArrayDesign]:
+    by_name: Dict[str, ArrayDesign] = {}
+    for d in model.load_array_designs():
+        by_name.setdefault(d["name"], d)  # first design with a name wins
+    return by_name
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _material_recs(mtime_ns: int) -> Dict[str, list]:
+    materials = model.load_materials()
+    return {
+        category: [rec_type.from_dict(item) for item in materials[category]]
+        for category, rec_type in model.MATERIAL_RECS.items()
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _array_design_recs_by_name(mtime_ns: int) -> Dict[str, ArrayDesignRec]:
+    by_name: Dict[str, ArrayDesignRec] = {}
+    for d in model.load_array_designs():
+        rec = ArrayDesignRec.from_dict(d)
+        by_name.setdefault(rec.name, rec)  # first design with a name wins
+    return by_name
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _process_steps(mtime_ns: int) -> List[dict]:
+    return labour_model.load_process_steps()
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _operator_profiles(mtime_ns: int) -> Dict[str, OperatorProfile]:
+    return labour_model.load_operator_profiles()
+
+
+def cached_product() -> Product:
+    return _product(file_mtime_ns(model.PRODUCT_FILE))
+
+
+def cached_materials() -> MaterialsDB:
+    return _materials(file_mtime_ns(model.MATERIALS_FILE))
+
+
+def cached_materials_index() -> Dict[str, dict]:
+    """
+    Materials per category as {"items", "by_type", "by_id"}.
+
+    by_type maps the lower-cased type to its items in file order; by_id maps
+    each id to its first item. Built once per file version, so pages look
+    items up instead of scanning the category on every rerun.
+    """
+    return _materials_index(file_mtime_ns(model.MATERIALS_FILE))
+
+
+def cached_foam_positions_by_thickness() -> Dict[float, int]:
+    """
+    Packaging foam thickness (mm, rounded to 0.001) -> position of that foam
+    in cached_materials_index()["Packaging"]["by_type"]["foam"].
+    """
+    return _foam_positions_by_thickness(file_mtime_ns(model.MATERIALS_FILE))
+
+
+def cached_material_recs() -> Dict[str, list]:
+    """
+    Typed records for the categories in model.MATERIAL_RECS, in file order.
+
+    Numbers are coerced once per file version, so pricing code reads plain
+    attributes instead of float(item.get(...)) on every rerun.
+    """
+    return _material_recs(file_mtime_ns(model.MATERIALS_FILE))
+
+
+def cached_array_designs() -> List[ArrayDesign]:
+    return _array_designs(file_mtime_ns(model.ARRAY_DESIGNS_FILE))
+
+
+def cached_array_designs_by_name() -> Dict[str, ArrayDesign]:
+    """Array design dicts keyed by name (first design with a name wins)."""
+    return _array_designs_by_name(file_mtime_ns(model.ARRAY_DESIGNS_FILE))
+
+
+def cached_array_design_recs_by_name() -> Dict[str, ArrayDesignRec]:
+    """
+    Array designs as typed records keyed by name.
+
+    Numbers are coerced and the index built once per file version, so a
+    page's design lookup is a dict hit instead of a scan.
+    """
+    return _array_design_recs_by_name(file_mtime_ns(model.ARRAY_DESIGNS_FILE))
+
+
+def cached_process_steps() -> List[dict]:
+    return _process_steps(file_mtime_ns(labour_model.PROCESS_PATH))
+
+
+def cached_operator_profiles() -> Dict[str, OperatorProfile]:
+    return _operator_profiles(file_mtime_ns(labour_model.OPERATOR_PROFILES_PATH))
@@ -1,7 +1,10 @@
+from collections import namedtuple
 from pathlib import Path
 from dataclasses import dataclass
-from typing import List, Dict
-import yaml
+from typing import List, Dict, Optional, Sequence, Tuple, Union
+import numpy as np
+
+from yaml_cache import file_signature, load_yaml_cached, write_yaml_if_changed
 
 # ============================================================
 # FILE PATHS
@@ -14,7 +17,7 @@ OPERATOR_PROFILES_PATH = ROOT / "data" / "operator_profiles.yaml"
 # ============================================================
 # DATA MODELS
 # ============================================================
-@dataclass
+@dataclass(slots=True, frozen=True)
 class OperatorProfile:
     id: str
     name: str
@@ -22,7 +25,7 @@ class OperatorProfile:
     hourly_rate: float
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LabourStepResult:
     id: str
     name: str
@@ -46,8 +49,7 @@ def load_operator_profiles() -> Dict[str, OperatorProfile]:
     if not OPERATOR_PROFILES_PATH.exists():
         return {}
 
-    with open(OPERATOR_PROFILES_PATH, "r") as f:
-        raw = yaml.safe_load(f) or {}
+    raw = load_yaml_cached(OPERATOR_PROFILES_PATH) or {}
 
     profiles: Dict[str, OperatorProfile] = {}
     for op in raw.get("operators", []):
@@ -63,26 +65,46 @@ def load_operator_profiles() -> Dict[str, OperatorProfile]:
 def save_operator_profiles(operators_list):
     """Save operator profiles back to YAML."""
     OPERATOR_PROFILES_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(OPERATOR_PROFILES_PATH, "w") as f:
-        yaml.safe_dump({"operators": operators_list}, f, sort_keys=False)
+    write_yaml_if_changed(OPERATOR_PROFILES_PATH, {"operators": operators_list})
 
 
 # ============================================================
 # PROCESS STEPS LOADING / AUTO–CONVERSION
 # ============================================================
+# Signature of the last process.yaml version known to need no upgrade;
+# lets repeated loads of an unchanged file skip the schema checks.
+_CLEAN_PROCESS_SIG: Optional[Tuple[int, int, int]] = None
+
+
 def load_process_steps() -> List[dict]:
-    """Load process steps and auto-upgrade schema (operators, batch/yield/quantity_source)."""
+    """
+    Load process steps and auto-upgrade schema (operators, batch/yield/quantity_source).
+
+    The returned step dicts may be shared with the YAML cache: treat them as
+    read-only (copy a step before changing it).
+    """
+    global _CLEAN_PROCESS_SIG
+
     if not PROCESS_PATH.exists():
         raise FileNotFoundError(f"process.yaml not found at {PROCESS_PATH}")
 
-    with open(PROCESS_PATH, "r") as f:
-        raw = yaml.safe_load(f) or {}
+    # Taken before loading: if the file changes in between, the next call
+    # simply sees a different signature and checks again.
+    sig = file_signature(PROCESS_PATH)
+    raw = load_yaml_cached(PROCESS_PATH) or {}
+
+    steps: List[dict] = list(raw.get("process", []))
 
-    steps: List[dict] = raw.get("process", [])
+    if sig == _CLEAN_PROCESS_SIG:
+        return steps
 
     upgraded = False
 
-    for step in steps:
+    for i, original in enumerate(steps):
+        # Upgrade a copy so the cached document itself is never modified
+        step = dict(original)
+        step_upgraded = False
+
         # --- old integer operators → list of slots ---
         ops = step.get("operators")
         if isinstance(ops, int):
@@ -90,64 +112,224 @@ def load_process_steps() -> List[dict]:
                 step["operators"] = []
             else:
                 step["operators"] = [{"operator_id": None} for _ in range(ops)]
-            upgraded = True
+            step_upgraded = True
 
         if not isinstance(step.get("operators"), list):
             step["operators"] = []
-            upgraded = True
+            step_upgraded = True
 
         # Default timing_basis: assume per_array if not set
         if "timing_basis" not in step:
             step["timing_basis"] = "per_array"
-            upgraded = True
+            step_upgraded = True
 
         # New: quantity_source (what the step scales with)
         if "quantity_source" not in step:
             # Default: array-level step
             step["quantity_source"] = "array"
-            upgraded = True
+            step_upgraded = True
 
         # New: yield_fraction (for fab/rework steps)
         if "yield_fraction" not in step:
             step["yield_fraction"] = 1.0
-            upgraded = True
+            step_upgraded = True
 
         # New: input mode hints for UI (doesn't affect calculations)
         if "entry_mode" not in step:
             step["entry_mode"] = "per_unit"  # or "per_batch"
-            upgraded = True
+            step_upgraded = True
         if "batch_units" not in step:
             step["batch_units"] = 1.0
-            upgraded = True
+            step_upgraded = True
         if "batch_seconds" not in step:
             step["batch_seconds"] = 0.0
-            upgraded = True
+            step_upgraded = True
 
         # Ensure core timing fields exist
         if "time_per_unit_s" not in step:
             step["time_per_unit_s"] = 0.0
-            upgraded = True
+            step_upgraded = True
         if "setup_time_s_per_array" not in step:
             step["setup_time_s_per_array"] = 0.0
+            step_upgraded = True
+
+        if step_upgraded:
+            steps[i] = step
             upgraded = True
 
     if upgraded:
         save_process_steps(steps)
+        _CLEAN_PROCESS_SIG = file_signature(PROCESS_PATH)
+    else:
+        _CLEAN_PROCESS_SIG = sig
 
     return steps
 
 
 def save_process_steps(steps: List[dict]):
     """Write updated process steps back to process.yaml."""
-    with open(PROCESS_PATH, "w") as f:
-        yaml.safe_dump({"process": steps}, f, sort_keys=False)
+    write_yaml_if_changed(PROCESS_PATH, {"process": steps})
 
 
 # ============================================================
 # CALCULATION CORE
 # ============================================================
+# Index into the quantity vector built in calculate_labour().
+# The last slot is always 0.0 and catches unknown quantity sources.
+_QTY_SOURCES = ("array", "cells", "strings", "bypass_diodes", "blocking_diodes")
+_QTY_INDEX = {name: i for i, name in enumerate(_QTY_SOURCES)}
+_QTY_UNKNOWN = len(_QTY_SOURCES)
+
+# Timing basis codes
+_BASIS_PER_ARRAY = 0
+_BASIS_PER_UNIT = 1
+_BASIS_UNKNOWN = 2
+
+
+# A process step with every field the calculation needs already coerced
+# (floats cast, basis lower-cased, yield clamped, operator ids as a tuple).
+CompiledStep = namedtuple(
+    "CompiledStep",
+    "id name basis qty_source time_per_unit setup yield_frac operators notes",
+)
+
+
+def compile_process_steps(steps: Sequence[dict]) -> List[CompiledStep]:
+    """
+    Normalise raw process-step dicts once so calculate_labour() can skip
+    the per-field .get()/float() work. Pass the result to calculate_labour()
+    in place of the raw dicts when calling it repeatedly for the same steps.
+    """
+    compiled: List[CompiledStep] = []
+    for step in steps:
+        yield_frac = float(step.get("yield_fraction", 1.0))
+        if yield_frac <= 0:
+            yield_frac = 1.0  # avoid divide-by-zero; treat as no yield adjustment
+
+        compiled.append(
+            CompiledStep(
+                id=step.get("id", ""),
+                name=step.get("name", ""),
+                basis=str(step.get("timing_basis", "per_array")).lower(),
+                qty_source=str(step.get("quantity_source", "array")),
+                time_per_unit=float(step.get("time_per_unit_s", 0.0)),
+                setup=float(step.get("setup_time_s_per_array", 0.0)),
+                yield_frac=yield_frac,
+                operators=tuple(op.get("operator_id") for op in step.get("operators", [])),
+                notes=step.get("notes", ""),
+            )
+        )
+    return compiled
+
+
+# (process.yaml signature, compiled steps) from the last
+# load_compiled_process_steps() call
+_COMPILED_PROCESS: Optional[Tuple[Tuple[int, int, int], List[CompiledStep]]] = None
+
+
+def load_compiled_process_steps() -> List[CompiledStep]:
+    """
+    load_process_steps() compiled with compile_process_steps(), reused for as
+    long as process.yaml keeps the same file signature.
+
+    The returned list is shared between calls: treat it as read-only.
+    """
+    global _COMPILED_PROCESS
+
+    steps = load_process_steps()
+    # load_process_steps() leaves the signature of the version it returned
+    sig = _CLEAN_PROCESS_SIG
+    if _COMPILED_PROCESS is not None and _COMPILED_PROCESS[0] == sig:
+        return _COMPILED_PROCESS[1]
+
+    compiled = compile_process_steps(steps)
+    _COMPILED_PROCESS = (sig, compiled)
+    return compiled
+
+
+def _segment_sums(values: np.ndarray, indptr: np.ndarray) -> np.ndarray:
+    """
+    Sum CSR-style segments: values[indptr[i]:indptr[i+1]] for each i.
+
+    np.add.reduceat returns values[start] (not 0) for an empty segment, so
+    only non-empty segments are reduced and the rest stay at zero.
+    """
+    out = np.zeros(len(indptr) - 1, dtype=np.float64)
+    if values.size:
+        non_empty = indptr[1:] > indptr[:-1]
+        out[non_empty] = np.add.reduceat(values, indptr[:-1][non_empty])
+    return out
+
+
+def _compile_steps(
+    steps: List[CompiledStep],
+    operator_profiles: Dict[str, OperatorProfile],
+) -> dict:
+    """
+    Flatten process steps into parallel NumPy arrays (one entry per step).
+
+    Everything that doesn't depend on the array geometry is resolved here,
+    including the summed hourly rate of each step's assigned operators, so
+    calculate_labour() only has to do a handful of vectorised operations.
+
+    Operator assignments are flattened CSR-style: op_idx holds an index into
+    `rates` for every valid assignment, and step i owns
+    op_idx[indptr[i]:indptr[i+1]].
+    """
+    n = len(steps)
+    basis_code = np.empty(n, dtype=np.int8)
+    qty_index = np.empty(n, dtype=np.intp)
+    time_per_unit = np.empty(n, dtype=np.float64)
+    setup = np.empty(n, dtype=np.float64)
+    yield_frac = np.empty(n, dtype=np.float64)
+
+    op_ids = list(operator_profiles)
+    op_index = {oid: i for i, oid in enumerate(op_ids)}
+    profiles = [operator_profiles[oid] for oid in op_ids]
+    rates = np.fromiter(
+        (operator_profiles[oid].hourly_rate for oid in op_ids),
+        dtype=np.float64,
+        count=len(op_ids),
+    )
+    op_idx: List[int] = []
+    indptr = np.zeros(n + 1, dtype=np.intp)
+
+    assigned: List[List[OperatorProfile]] = []
+
+    for i, step in enumerate(steps):
+        if step.basis == "per_array":
+            basis_code[i] = _BASIS_PER_ARRAY
+        elif step.basis == "per_unit":
+            basis_code[i] = _BASIS_PER_UNIT
+        else:
+            basis_code[i] = _BASIS_UNKNOWN
+
+        qty_index[i] = _QTY_INDEX.get(step.qty_source, _QTY_UNKNOWN)
+        time_per_unit[i] = step.time_per_unit
+        setup[i] = step.setup
+        yield_frac[i] = step.yield_frac
+
+        # Resolve assigned operators once; `assigned` reuses the same indices
+        start = len(op_idx)
+        op_idx.extend(op_index[oid] for oid in step.operators if oid and oid in op_index)
+        indptr[i + 1] = len(op_idx)
+        assigned.append([profiles[j] for j in op_idx[start:]])
+
+    rate_sum = _segment_sums(rates[np.asarray(op_idx, dtype=np.intp)], indptr)
+
+    return {
+        "basis_code": basis_code,
+        "qty_index": qty_index,
+        "time_per_unit": time_per_unit,
+        "setup": setup,
+        "yield_frac": yield_frac,
+        "rate_sum": rate_sum,
+        "assigned": assigned,
+    }
+
+
 def calculate_labour(
-    process_steps: List[dict],
+    process_steps: Sequence[Union[dict, CompiledStep]],
     operator_profiles: Dict[str, OperatorProfile],
     cells_per_string: int,
     strings_per_array: int,
@@ -176,82 +358,68 @@ def calculate_labour(
             array          -> 1 (degenerate case)
         yield_fraction < 1 means more work per good unit:
             effective_units = units_per_array / yield_fraction
-    """
-
-    cells_per_array = cells_per_string * strings_per_array
-
-    qty_map = {
-        "array": 1.0,
-        "cells": float(cells_per_array),
-        "strings": float(strings_per_array),
-        "bypass_diodes": float(bypass_diodes_per_array),
-        "blocking_diodes": float(blocking_diodes_per_array),
-    }
-
-    results: List[LabourStepResult] = []
-    total_cost = 0.0
-    total_hours = 0.0
-
-    for step in process_steps:
-        basis = str(step.get("timing_basis", "per_array")).lower()
-        quantity_source = str(step.get("quantity_source", "array"))
-        time_per_unit_s = float(step.get("time_per_unit_s", 0.0))
-        setup = float(step.get("setup_time_s_per_array", 0.0))
-        yield_fraction = float(step.get("yield_fraction", 1.0))
-        if yield_fraction <= 0:
-            yield_fraction = 1.0  # avoid divide-by-zero; treat as no yield adjustment
-
-        units_per_array = 0.0
-        total_seconds = 0.0
-
-        if basis == "per_array":
-            units_per_array = 1.0
-            total_seconds = time_per_unit_s + setup
 
-        elif basis == "per_unit":
-            nominal_units = float(qty_map.get(quantity_source, 0.0))
-            effective_units = nominal_units / yield_fraction
-            units_per_array = nominal_units
-            total_seconds = effective_units * time_per_unit_s + setup
+    - any other timing_basis: the step is ignored (0 units, 0 seconds).
 
-        else:
-            # Unknown basis → ignore this step
-            units_per_array = 0.0
-            total_seconds = 0.0
-
-        operator_hours = total_seconds / 3600.0
-
-        # Resolve assigned operators
-        assigned_profiles: List[OperatorProfile] = []
-        for op in step.get("operators", []):
-            oid = op.get("operator_id")
-            if oid and oid in operator_profiles:
-                assigned_profiles.append(operator_profiles[oid])
-
-        step_cost = sum(op.hourly_rate * operator_hours for op in assigned_profiles)
+    process_steps may be raw dicts or the output of compile_process_steps()
+    (load_compiled_process_steps() caches that per process.yaml version).
+    """
 
-        total_cost += step_cost
-        total_hours += operator_hours
+    cells_per_array = cells_per_string * strings_per_array
 
-        results.append(
-            LabourStepResult(
-                id=step.get("id", ""),
-                name=step.get("name", ""),
-                timing_basis=basis,
-                quantity_source=quantity_source,
-                units_per_array=units_per_array,
-                time_per_unit_s=time_per_unit_s,
-                setup_time_s_per_array=setup,
-                total_step_seconds=total_seconds,
-                operator_hours=operator_hours,
-                cost=step_cost,
-                assigned_operators=assigned_profiles,
-                notes=step.get("notes", ""),
-            )
+    # Same order as _QTY_SOURCES, plus the trailing "unknown source" slot
+    qty_vec = np.array(
+        [
+            1.0,
+            float(cells_per_array),
+            float(strings_per_array),
+            float(bypass_diodes_per_array),
+            float(blocking_diodes_per_array),
+            0.0,
+        ]
+    )
+
+    if process_steps and isinstance(process_steps[0], CompiledStep):
+        steps = list(process_steps)
+    else:
+        steps = compile_process_steps(process_steps)
+
+    c = _compile_steps(steps, operator_profiles)
+    per_array = c["basis_code"] == _BASIS_PER_ARRAY
+    per_unit = c["basis_code"] == _BASIS_PER_UNIT
+
+    nominal_units = qty_vec[c["qty_index"]]
+    units_per_array = np.where(per_array, 1.0, np.where(per_unit, nominal_units, 0.0))
+
+    effective_units = nominal_units / c["yield_frac"]
+    total_seconds = np.where(
+        per_array,
+        c["time_per_unit"] + c["setup"],
+        np.where(per_unit, effective_units * c["time_per_unit"] + c["setup"], 0.0),
+    )
+    operator_hours = total_seconds / 3600.0
+    step_cost = c["rate_sum"] * operator_hours
+
+    results: List[LabourStepResult] = [
+        LabourStepResult(
+            id=step.id,
+            name=step.name,
+            timing_basis=step.basis,
+            quantity_source=step.qty_source,
+            units_per_array=float(units_per_array[i]),
+            time_per_unit_s=float(c["time_per_unit"][i]),
+            setup_time_s_per_array=float(c["setup"][i]),
+            total_step_seconds=float(total_seconds[i]),
+            operator_hours=float(operator_hours[i]),
+            cost=float(step_cost[i]),
+            assigned_operators=c["assigned"][i],
+            notes=step.notes,
         )
+        for i, step in enumerate(steps)
+    ]
 
     return {
         "steps": results,
-        "total_cost": total_cost,
-        "total_hours": total_hours,
+        "total_cost": float(step_cost.sum()),
+        "total_hours": float(operator_hours.sum()),
     }
@@ -1,8 +1,8 @@
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field, fields
 from pathlib import Path
-from typing import Any, Dict, List, TypedDict
+from typing import Any, Dict, List, Optional, TypedDict
 
-import yaml
+from yaml_cache import load_yaml_cached, write_yaml_if_changed
 
 # -----------------------------------------------------------------------------
 # Paths
@@ -17,9 +17,14 @@ ARRAY_DESIGNS_FILE = DATA_DIR / "array_designs.yaml"
 # -----------------------------------------------------------------------------
 # Product model
 # -----------------------------------------------------------------------------
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Product:
-    """Core product configuration for the MAT array."""
+    """
+    Core product configuration for the MAT array.
+
+    Immutable; the derived geometry (cells_per_array, total_string_length_mm)
+    is computed once in __post_init__ rather than on every access.
+    """
 
     name: str = "Default MAT Array"
 
@@ -36,34 +41,37 @@ class Product:
     positive_end_gap_mm: float = 5.0
     negative_end_gap_mm: float = 5.0
 
-    @property
-    def cells_per_array(self) -> int:
-        """Total number of cells in the full array."""
-        return self.cells_per_string * self.strings_per_array
+    # Derived (not stored in YAML)
+    cells_per_array: int = field(init=False, repr=False, compare=False)
+    total_string_length_mm: float = field(init=False, repr=False, compare=False)
 
-    @property
-    def total_string_length_mm(self) -> float:
-        """
-        Total physical length of one string [mm].
+    def __post_init__(self) -> None:
+        # Total number of cells in the full array.
+        object.__setattr__(
+            self, "cells_per_array", self.cells_per_string * self.strings_per_array
+        )
 
-        Model:
-        length = positive_end_gap +
-                 negative_end_gap +
-                 cells_per_string * cell_height +
-                 (cells_per_string - 1) * gap_between_cells
-        """
+        # Total physical length of one string [mm].
+        #
+        # Model:
+        # length = positive_end_gap +
+        #          negative_end_gap +
+        #          cells_per_string * cell_height +
+        #          (cells_per_string - 1) * gap_between_cells
         n = max(self.cells_per_string, 0)
         gaps = max(n - 1, 0)
-        return (
+        object.__setattr__(
+            self,
+            "total_string_length_mm",
             self.positive_end_gap_mm
             + self.negative_end_gap_mm
             + n * self.cell_height_mm
-            + gaps * self.gap_between_cells_mm
+            + gaps * self.gap_between_cells_mm,
         )
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to a plain dict suitable for YAML."""
-        return asdict(self)
+        """Convert to a plain dict suitable for YAML (input fields only)."""
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.init}
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Product":
@@ -92,8 +100,7 @@ def load_product() -> Product:
         return get_default_product()
 
     try:
-        with PRODUCT_FILE.open("r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
+        data = load_yaml_cached(PRODUCT_FILE) or {}
         return Product.from_dict(data)
     except Exception:
         # Fallback to default if there's any issue with the YAML
@@ -103,8 +110,7 @@ def load_product() -> Product:
 def save_product(product: Product) -> None:
     """Save the product configuration to product.yaml."""
     ensure_data_dir()
-    with PRODUCT_FILE.open("w", encoding="utf-8") as f:
-        yaml.safe_dump(product.to_dict(), f, sort_keys=False)
+    write_yaml_if_changed(PRODUCT_FILE, product.to_dict())
 
 
 # -----------------------------------------------------------------------------
@@ -156,10 +162,23 @@ MATERIAL_CATEGORIES: List[str] = [
     "Packaging",
 ]
 
+# Immutable views for the hot load/save paths
+_CATEGORIES_TUPLE = tuple(MATERIAL_CATEGORIES)
+_CATEGORIES_SET = frozenset(MATERIAL_CATEGORIES)
+
+
+def _add_missing_categories(data: dict) -> None:
+    """Add an empty list for every category missing from `data` (in order)."""
+    missing = _CATEGORIES_SET - data.keys()
+    if missing:
+        for category in _CATEGORIES_TUPLE:
+            if category in missing:
+                data[category] = []
+
 
 def get_default_materials() -> MaterialsDB:
     """Default empty materials structure with all categories present."""
-    return {category: [] for category in MATERIAL_CATEGORIES}
+    return {category: [] for category in _CATEGORIES_TUPLE}
 
 
 def ensure_materials_file() -> None:
@@ -172,8 +191,7 @@ def ensure_materials_file() -> None:
 
     if not MATERIALS_FILE.exists():
         default_data = get_default_materials()
-        with MATERIALS_FILE.open("w", encoding="utf-8") as f:
-            yaml.safe_dump(default_data, f, sort_keys=False)
+        write_yaml_if_changed(MATERIALS_FILE, default_data)
 
 
 def load_materials() -> MaterialsDB:
@@ -183,27 +201,28 @@ def load_materials() -> MaterialsDB:
     Ensures:
     - File exists (created if missing)
     - All expected categories exist as lists
+
+    The category lists are shared with the YAML cache: callers that edit
+    materials must copy.deepcopy() the result first.
     """
     ensure_materials_file()
 
     try:
-        with MATERIALS_FILE.open("r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
+        data = load_yaml_cached(MATERIALS_FILE) or {}
     except Exception:
         data = {}
 
-    # Make sure it's a dict
-    if not isinstance(data, dict):
-        data = {}
+    # Make sure it's a dict (and a new one: the cached document is read-only)
+    data = dict(data) if isinstance(data, dict) else {}
 
-    # Ensure all categories exist
-    for category in MATERIAL_CATEGORIES:
-        data.setdefault(category, [])
-
-        # Make sure each category is a list
+    # Make sure each category already present is a list
+    for category in _CATEGORIES_SET.intersection(data):
         if not isinstance(data[category], list):
             data[category] = []
 
+    # Ensure all categories exist
+    _add_missing_categories(data)
+
     return data  # type: ignore[return-value]
 
 
@@ -212,11 +231,85 @@ def save_materials(materials: MaterialsDB) -> None:
     ensure_data_dir()
 
     # Ensure all categories exist before saving
-    for category in MATERIAL_CATEGORIES:
-        materials.setdefault(category, [])
+    _add_missing_categories(materials)
+
+    write_yaml_if_changed(MATERIALS_FILE, materials)
+
+
+def _float_or_zero(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+@dataclass(slots=True, frozen=True)
+class SilverRibbonRec:
+    """
+    Typed view of one Silver Ribbon item, for pricing code.
+
+    Numbers are coerced once in from_dict; a missing or unparsable one becomes
+    0.0, which prices the ribbon at zero exactly as the dict helpers do.
+    Frozen, so records are hashable and can key memoised helpers directly.
+    """
+
+    id: str = ""
+    name: str = ""
+    width_mm: float = 0.0
+    thickness_mm: float = 0.0
+    density_g_cm3: float = 0.0
+    price_per_g: float = 0.0
+    price_currency: str = "USD"
+
+    @classmethod
+    def from_dict(cls, item: MaterialItem) -> "SilverRibbonRec":
+        return cls(
+            id=str(item.get("id", "")),
+            name=str(item.get("name", "")),
+            width_mm=_float_or_zero(item.get("width_mm", 0)),
+            thickness_mm=_float_or_zero(item.get("thickness_mm", 0)),
+            density_g_cm3=_float_or_zero(item.get("density_g_cm3", 0)),
+            price_per_g=_float_or_zero(item.get("price_per_g", 0)),
+            price_currency=str(item.get("price_currency") or "USD").upper(),
+        )
 
-    with MATERIALS_FILE.open("w", encoding="utf-8") as f:
-        yaml.safe_dump(materials, f, sort_keys=False)
+
+@dataclass(slots=True, frozen=True)
+class UnitCostRec:
+    """
+    Typed view of a unit-priced item (Diodes, Weld heads), for pricing code.
+
+    A price that isn't set stays None; one that can't be parsed becomes 0.0.
+    num_welds only means something for weld heads.
+    """
+
+    id: str = ""
+    name: str = ""
+    currency: str = "USD"
+    unit_cost_usd: Optional[float] = None
+    unit_cost_gbp: Optional[float] = None
+    num_welds: float = 0.0
+
+    @classmethod
+    def from_dict(cls, item: MaterialItem) -> "UnitCostRec":
+        usd = item.get("unit_cost_usd")
+        gbp = item.get("unit_cost_gbp")
+        return cls(
+            id=str(item.get("id", "")),
+            name=str(item.get("name", "")),
+            currency=str(item.get("currency") or "USD").upper(),
+            unit_cost_usd=None if usd is None else _float_or_zero(usd),
+            unit_cost_gbp=None if gbp is None else _float_or_zero(gbp),
+            num_welds=_float_or_zero(item.get("num_welds", 0)),
+        )
+
+
+# Categories that have a typed record view (see cached_material_recs)
+MATERIAL_RECS = {
+    "Silver Ribbon": SilverRibbonRec,
+    "Diodes": UnitCostRec,
+    "Weld heads": UnitCostRec,
+}
 
 
 # -----------------------------------------------------------------------------
@@ -259,22 +352,84 @@ class ArrayDesign(TypedDict, total=False):
     negative_bar_length_mm: float
 
 
+@dataclass(slots=True)
+class ArrayDesignRec:
+    """
+    Typed view of one ArrayDesign dict, for code that reads many fields.
+
+    Numbers are coerced once in from_dict instead of float(d.get(...)) at
+    every use. Storage stays the plain list of dicts.
+    """
+
+    name: str = ""
+    num_cells: int = 1
+
+    eff_am15_percent: float = 0.0
+    eff_am0_percent: float = 0.0
+
+    cell_height_mm: float = 0.0
+    gap_between_cells_mm: float = 0.0
+    positive_end_gap_mm: float = 0.0
+    negative_end_gap_mm: float = 0.0
+
+    blocking_tab_silver_id: str = ""
+    blocking_tab_width_mm: float = 0.0
+    blocking_tab_length1_mm: float = 0.0
+    blocking_tab_length2_mm: float = 0.0
+
+    negative_end_silver_id: str = ""
+    negative_end_width_mm: float = 0.0
+    negative_end_length_mm: float = 0.0
+
+    negative_bar_silver_id: str = ""
+    negative_bar_width_mm: float = 0.0
+    negative_bar_length_mm: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ArrayDesignRec":
+        """
+        Build from a (possibly partial) design dict. Missing keys, and numbers
+        that don't parse (None, stray text), use the defaults.
+        """
+        values: Dict[str, Any] = {}
+        for name, conv in _DESIGN_REC_FIELDS:
+            if name not in data:
+                continue
+            if conv is None:
+                values[name] = data[name]
+                continue
+            try:
+                values[name] = conv(data[name])
+            except (TypeError, ValueError):
+                pass
+        return cls(**values)
+
+
+# (field name, numeric converter or None for ids/names kept as stored)
+_DESIGN_REC_FIELDS = tuple(
+    (f.name, f.type if f.type in (int, float) else None)
+    for f in fields(ArrayDesignRec)
+)
+
+
 def ensure_array_designs_file() -> None:
     """Ensure array_designs.yaml exists; initialise as empty list if missing."""
     ensure_data_dir()
 
     if not ARRAY_DESIGNS_FILE.exists():
-        with ARRAY_DESIGNS_FILE.open("w", encoding="utf-8") as f:
-            yaml.safe_dump([], f, sort_keys=False)
+        write_yaml_if_changed(ARRAY_DESIGNS_FILE, [])
 
 
 def load_array_designs() -> List[ArrayDesign]:
-    """Load all array designs from array_designs.yaml."""
+    """
+    Load all array designs from array_designs.yaml.
+
+    The list is shared with the YAML cache: copy.deepcopy() it before editing.
+    """
     ensure_array_designs_file()
 
     try:
-        with ARRAY_DESIGNS_FILE.open("r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or []
+        data = load_yaml_cached(ARRAY_DESIGNS_FILE) or []
     except Exception:
         data = []
 
@@ -288,5 +443,4 @@ def load_array_designs() -> List[ArrayDesign]:
 def save_array_designs(designs: List[ArrayDesign]) -> None:
     """Save the list of array designs back to array_designs.yaml."""
     ensure_data_dir()
-    with ARRAY_DESIGNS_FILE.open("w", encoding="utf-8") as f:
-        yaml.safe_dump(designs, f, sort_keys=False)
+    write_yaml_if_changed(ARRAY_DESIGNS_FILE, designs)
@@ -1,10 +1,25 @@
+import functools
+from contextlib import nullcontext
+from dataclasses import dataclass, field, fields
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
 import streamlit as st
 
+from cached_loaders import (
+    cached_array_designs,
+    cached_array_designs_by_name,
+    cached_materials,
+    cached_product,
+    file_mtime_ns,
+)
 from model import (
-    load_array_designs,
+    ARRAY_DESIGNS_FILE,
+    PRODUCT_FILE,
     save_array_designs,
-    load_materials,
     ArrayDesign,
+    ArrayDesignRec,
 )
 
 # Assumptions for power calculations
@@ -13,24 +28,104 @@ CELL_AREA_M2 = CELL_AREA_CM2 / 10_000.0  # 20 cm^2 -> 0.002 m^2
 IRRADIANCE_AM15 = 1000.0  # W/m^2 (typical lab AM1.5G)
 IRRADIANCE_AM0 = 1366.0   # W/m^2 (approx solar constant)
 
+# W per cell per efficiency-% point, folded once at import:
+# P_cell = eff_pct / 100 * irradiance * cell_area = eff_pct * _K
+_K_AM15 = IRRADIANCE_AM15 * CELL_AREA_M2 / 100.0
+_K_AM0 = IRRADIANCE_AM0 * CELL_AREA_M2 / 100.0
 
-def compute_power_for_design(design: ArrayDesign) -> dict:
-    """
-    Compute power per cell and per array at AM1.5 and AM0.
+# Silver Ribbon selectboxes show at most this many options; above it a
+# filter box appears so large material DBs don't bloat every rerun.
+SILVER_OPTIONS_CAP = 50
+
+
+# Numeric design fields -> Python type; everything else is an object column.
+# int columns (num_cells) are stored as int32, floats as float64.
+_NUMERIC_FIELDS = {
+    f.name: f.type for f in fields(ArrayDesignRec) if f.type in (int, float)
+}
+
+
+@dataclass(slots=True)
+class DesignTable:
     """
-    num_cells = float(design.get("num_cells", 0))
-    eff15_pct = float(design.get("eff_am15_percent", 0.0))
-    eff0_pct = float(design.get("eff_am0_percent", 0.0))
+    Column-oriented (SoA) view of a list of designs: one numpy array per key.
 
-    eff15 = eff15_pct / 100.0
-    eff0 = eff0_pct / 100.0
+    Built from the list of dicts for the bulk maths and the table display.
+    The list of dicts stays the stored form (YAML, other pages). Keys
+    missing from some designs are NaN, as in pd.DataFrame(designs).
 
-    p_cell_15 = eff15 * IRRADIANCE_AM15 * CELL_AREA_M2
-    p_array_15 = p_cell_15 * num_cells
+    Numeric fields that don't parse (None, stray text) are NaN as well and
+    are listed in `invalid` as (design name, field), so the page can still
+    list the design and warn about it.
+    """
 
-    p_cell_0 = eff0 * IRRADIANCE_AM0 * CELL_AREA_M2
-    p_array_0 = p_cell_0 * num_cells
+    columns: Dict[str, np.ndarray]
+    size: int
+    invalid: List[Tuple[str, str]] = field(default_factory=list)
+
+    @classmethod
+    def from_designs(cls, designs: List[ArrayDesign]) -> "DesignTable":
+        n = len(designs)
+        keys = dict.fromkeys(k for d in designs for k in d)
+        columns: Dict[str, np.ndarray] = {}
+        invalid: List[Tuple[str, str]] = []
+        for key in keys:
+            values = [d.get(key, np.nan) for d in designs]
+            kind = _NUMERIC_FIELDS.get(key)
+            if kind is None:
+                columns[key] = np.array(values, dtype=object)
+                continue
+            if kind is int and all(key in d for d in designs):
+                try:
+                    columns[key] = np.fromiter(
+                        map(int, values), dtype=np.int32, count=n
+                    )
+                    continue
+                except (TypeError, ValueError):
+                    pass  # a bad entry: fall back to a float column below
+            # floats, ints with gaps or bad entries (NaN needs a float column)
+            column = np.empty(n, dtype=np.float64)
+            for i, value in enumerate(values):
+                try:
+                    column[i] = float(value)
+                except (TypeError, ValueError):
+                    column[i] = np.nan
+                    invalid.append((str(designs[i].get("name", f"#{i}")), key))
+            columns[key] = column
+        return cls(columns=columns, size=n, invalid=invalid)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def numeric(self, key: str, default: float = 0.0) -> np.ndarray:
+        """Column as float64, missing entries (or column) set to `default`."""
+        col = self.columns.get(key)
+        if col is None:
+            return np.full(self.size, default, dtype=np.float64)
+        col = col.astype(np.float64, copy=False)
+        return np.where(np.isnan(col), default, col)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns)
+
+
+def compute_power_for_design(design: Union[ArrayDesign, ArrayDesignRec]) -> dict:
+    """
+    Compute power per cell and per array at AM1.5 and AM0.
 
+    Accepts a design dict or an already-coerced ArrayDesignRec.
+    """
+    if isinstance(design, ArrayDesignRec):
+        terms = _power_terms(
+            design.num_cells, design.eff_am15_percent, design.eff_am0_percent
+        )
+    else:
+        terms = _power_terms(
+            design.get("num_cells", 0),
+            design.get("eff_am15_percent", 0.0),
+            design.get("eff_am0_percent", 0.0),
+        )
+    p_cell_15, p_array_15, p_cell_0, p_array_0 = terms
     return {
         "P_cell_AM15_W": p_cell_15,
         "P_array_AM15_W": p_array_15,
@@ -39,503 +134,535 @@ def compute_power_for_design(design: ArrayDesign) -> dict:
     }
 
 
+# Every cost page asks for the selected design's power on each rerun; the
+# design only changes when it's edited or re-selected, so memoise on the three
+# raw inputs (a value key, unlike hashing the design by name).
+@functools.lru_cache(maxsize=256)
+def _power_terms(num_cells, eff_am15_percent, eff_am0_percent):
+    num_cells = float(num_cells)
+    p_cell_15 = float(eff_am15_percent) * _K_AM15
+    p_cell_0 = float(eff_am0_percent) * _K_AM0
+    return p_cell_15, p_cell_15 * num_cells, p_cell_0, p_cell_0 * num_cells
+
+
+def selected_design_context(
+    selected_name: str, illumination: str
+) -> Optional[dict]:
+    """
+    What every cost page needs for the selected design, or None if the
+    design no longer exists.
+
+    Keys: product, exchange_rate (float), design, power (as from
+    compute_power_for_design) and array_power (for the given illumination).
+    Built once per product/designs file version, so switching pages or
+    changing a widget reuses it. Treat the result as read-only.
+    """
+    return _selected_design_context(
+        file_mtime_ns(PRODUCT_FILE),
+        file_mtime_ns(ARRAY_DESIGNS_FILE),
+        selected_name,
+        illumination,
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _selected_design_context(
+    product_mtime_ns, designs_mtime_ns, selected_name, illumination
+):
+    design = cached_array_designs_by_name().get(selected_name)
+    if design is None:
+        return None
+    product = cached_product()
+    power = compute_power_for_design(design)
+    array_power = (
+        power["P_array_AM15_W"]
+        if illumination == "AM1.5"
+        else power["P_array_AM0_W"]
+    )
+    return {
+        "product": product,
+        "exchange_rate": float(product.exchange_rate_gbp_per_usd),
+        "design": design,
+        "power": power,
+        "array_power": array_power,
+    }
+
+
+def compute_power_bulk(
+    designs: Union[List[ArrayDesign], DesignTable]
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorised compute_power_for_design over a list of designs (or a table).
+
+    Returns the same four keys, each an array with one entry per design.
+    """
+    if isinstance(designs, DesignTable):
+        table = designs
+    else:
+        table = DesignTable.from_designs(designs)
+    num_cells = table.numeric("num_cells")
+    eff15_pct = table.numeric("eff_am15_percent")
+    eff0_pct = table.numeric("eff_am0_percent")
+
+    p_cell_15 = eff15_pct * _K_AM15
+    p_cell_0 = eff0_pct * _K_AM0
+
+    return {
+        "P_cell_AM15_W": p_cell_15,
+        "P_array_AM15_W": p_cell_15 * num_cells,
+        "P_cell_AM0_W": p_cell_0,
+        "P_array_AM0_W": p_cell_0 * num_cells,
+    }
+
+
+# Dropdown label templates (bound .format, looked up once)
+_SILVER_LABEL = "{}: {} \u2013 {} ({} mm)".format
+_DESIGN_LABEL = "{}: {} \u2013 {} cells".format
+
+
 def _silver_labels(silver_items):
     """Helper to build dropdown labels for Silver Ribbon items."""
+    fmt = _SILVER_LABEL
     return [
-        f"{i}: {item.get('id', '(no id)')} – "
-        f"{item.get('name', '(no name)')} "
-        f"({item.get('width_mm', '?')} mm)"
+        fmt(
+            i,
+            item.get("id", "(no id)"),
+            item.get("name", "(no name)"),
+            item.get("width_mm", "?"),
+        )
         for i, item in enumerate(silver_items)
     ]
 
 
+def _design_labels(designs):
+    """Helper to build dropdown labels for the design selectboxes."""
+    fmt = _DESIGN_LABEL
+    return [
+        fmt(i, d.get("name", "(no name)"), d.get("num_cells", "?"))
+        for i, d in enumerate(designs)
+    ]
+
+
+def _silver_index_by_id(silver_items) -> Dict[str, int]:
+    """Map str(id) -> index in silver_items (first occurrence wins)."""
+    index: Dict[str, int] = {}
+    for i, item in enumerate(silver_items):
+        index.setdefault(str(item.get("id", "")), i)
+    return index
+
+
 def _find_silver_index_by_id(silver_items, silver_id: str) -> int:
     """Find index in silver_items with given id, default to 0 if not found."""
-    if not silver_items:
-        return 0
-    for i, item in enumerate(silver_items):
-        if str(item.get("id", "")) == str(silver_id):
-            return i
-    return 0
+    return _silver_index_by_id(silver_items).get(str(silver_id), 0)
 
 
-def render() -> None:
-    st.title("Array Designs")
+class _SilverChoices:
+    """
+    Silver Ribbon items plus their dropdown labels and id index.
 
-    st.markdown(
-        """
-        Define different array designs here. Each design specifies:
+    Labels and index are built on first access, so a rerun that never
+    renders a Silver Ribbon selectbox (e.g. the delete fragment) skips them.
+    """
 
-        1. **Number of cells**  
-        2. **Cell efficiency at AM1.5 and AM0** (20 cm² cells → power per cell and per array)  
-        3. **Cell height and gaps**  
-        4. **End gaps**  
-        5. **Blocking diode tabs** – *lengths + Silver Ribbon width*  
-        6. **Negative end bars** – *Silver width + length*  
-        7. **Negative bars** – *Silver width + length*
-        """
+    def __init__(self, items) -> None:
+        self.items = items
+
+    @functools.cached_property
+    def labels(self) -> List[str]:
+        return _silver_labels(self.items)
+
+    @functools.cached_property
+    def index_by_id(self) -> Dict[str, int]:
+        return _silver_index_by_id(self.items)
+
+
+def _silver_filter(silver_items, key: str) -> str:
+    """Filter text box for the Silver Ribbon selectboxes (only for long lists)."""
+    if len(silver_items) <= SILVER_OPTIONS_CAP:
+        return ""
+    return st.text_input(
+        "Filter Silver Ribbon (id or name)",
+        key=key,
+        help=f"Only the first {SILVER_OPTIONS_CAP} matches are listed.",
     )
 
-    designs = load_array_designs()
-    materials_db = load_materials()
-    silver_items = materials_db.get("Silver Ribbon", [])
 
-    # ------------------ SHOW EXISTING DESIGNS ------------------
-    st.markdown("### Existing Array Designs")
+def _silver_options(
+    silver_items, needle: str, keep: Iterable[int] = ()
+) -> Sequence[int]:
+    """
+    Indices of silver_items to offer in a selectbox.
+
+    Filters on id/name substring and caps at SILVER_OPTIONS_CAP. Indices in
+    `keep` (the design's current selections) are always included so the
+    default stays valid. If nothing matches, the first items are shown.
+    """
+    if len(silver_items) <= SILVER_OPTIONS_CAP:
+        return range(len(silver_items))
+
+    needle = needle.strip().lower()
+    matches = [
+        i
+        for i, item in enumerate(silver_items)
+        if needle in str(item.get("id", "")).lower()
+        or needle in str(item.get("name", "")).lower()
+    ][:SILVER_OPTIONS_CAP]
+    if not matches:
+        matches = list(range(SILVER_OPTIONS_CAP))
+
+    kept = [i for i in dict.fromkeys(keep) if i not in matches]
+    return kept + matches
+
+
+def _session_designs() -> List[ArrayDesign]:
+    """
+    This session's working list of designs.
+
+    Kept in st.session_state so add/edit/delete can mutate it in place;
+    reloaded when the file on disk changes under us (e.g. a save from
+    another session).
+    """
+    state = st.session_state
+    mtime = file_mtime_ns(ARRAY_DESIGNS_FILE)
+    if "array_designs" in state and state.get("array_designs_mtime") == mtime:
+        return state["array_designs"]
+
+    state["array_designs"] = cached_array_designs()
+    state["array_designs_mtime"] = mtime
+    return state["array_designs"]
+
+
+def _save_session_designs(designs: List[ArrayDesign]) -> None:
+    """
+    Persist the session's designs.
+
+    The write is atomic and skipped when nothing changed; the new mtime just
+    makes _session_designs() reload the same list from disk.
+    """
+    save_array_designs(designs)
 
+
+def _render_designs_table(designs: List[ArrayDesign]) -> None:
     if designs:
-        rows = []
-        for d in designs:
-            row = dict(d)
-            row.update(compute_power_for_design(d))
-            rows.append(row)
-        st.table(rows)
+        table = DesignTable.from_designs(designs)
+        if table.invalid:
+            st.warning(
+                "Some design values aren't numbers and are treated as empty: "
+                + ", ".join(f"{name} → {key}" for name, key in table.invalid)
+            )
+        df = table.to_frame().assign(**compute_power_bulk(table))
+        st.dataframe(df, use_container_width=True)
     else:
         st.info("No designs yet. Add one below.")
 
-    st.markdown("---")
 
-    # =========================================================
-    #   ADD NEW DESIGN
-    # =========================================================
-    with st.expander("➕ Add new Array Design", expanded=False):
-        with st.form("add_design"):
-            name = st.text_input("Design name", key="add_name")
+# =========================================================
+#   ADD / EDIT / DELETE FRAGMENTS
+# =========================================================
+# Each section is an st.fragment, so interacting with one reruns only that
+# section. A section that changes the designs queues its message and asks
+# for one full rerun, so the table and the other sections catch up.
+
+
+def _flash_and_rerun(section: str, kind: str, message: str) -> None:
+    """Show `message` (as st.<kind>) in `section` after a full-page rerun."""
+    st.session_state[f"array_designs_flash_{section}"] = (kind, message)
+    st.rerun()
+
+
+def _show_flash(section: str) -> None:
+    flash = st.session_state.pop(f"array_designs_flash_{section}", None)
+    if flash is not None:
+        kind, message = flash
+        getattr(st, kind)(message)
+
+
+# ---------------------------------------------------------
+#   Shared add/edit form
+# ---------------------------------------------------------
+# Every float input is min 0, "%.2f". Widget keys are f"{prefix}_{field}".
+
+# (field, label, step)
+_EFFICIENCY_FIELDS = (
+    ("eff_am15_percent", "Efficiency AM1.5 (%)", 0.1),
+    ("eff_am0_percent", "Efficiency AM0 (%)", 0.1),
+)
+_GEOMETRY_FIELDS = (
+    ("cell_height_mm", "Cell height (mm)", 0.1),
+    ("gap_between_cells_mm", "Gap between cells (mm)", 0.1),
+    ("positive_end_gap_mm", "Positive end gap (mm)", 0.1),
+    ("negative_end_gap_mm", "Negative end gap (mm)", 0.1),
+)
+# (heading, selectbox label, field stem, length fields as (field, label, step))
+# The stem gives "<stem>_silver_id" and "<stem>_width_mm".
+_SILVER_SECTIONS = (
+    (
+        "#### Blocking Diode Tabs",
+        "Blocking diode tab width (Silver Ribbon)",
+        "blocking_tab",
+        (
+            ("blocking_tab_length1_mm", "Tab length 1 (mm)", 0.5),
+            ("blocking_tab_length2_mm", "Tab length 2 (mm)", 0.5),
+        ),
+    ),
+    (
+        "#### Negative End Bar",
+        "Negative end width (Silver Ribbon)",
+        "negative_end",
+        (
+            (
+                "negative_end_length_mm",
+                "Negative end length (mm) (doubled later – two bars)",
+                0.5,
+            ),
+        ),
+    ),
+    (
+        "#### Negative Bar",
+        "Negative bar width (Silver Ribbon)",
+        "negative_bar",
+        (("negative_bar_length_mm", "Negative bar length (mm)", 0.5),),
+    ),
+)
+
+# Starting values of the Add form
+_NEW_DESIGN_DEFAULTS = ArrayDesignRec(
+    num_cells=20,
+    eff_am15_percent=30.0,
+    eff_am0_percent=31.0,
+    cell_height_mm=6.6,
+    gap_between_cells_mm=1.0,
+    positive_end_gap_mm=5.0,
+    negative_end_gap_mm=5.0,
+    blocking_tab_length1_mm=10.0,
+    blocking_tab_length2_mm=10.0,
+    negative_end_length_mm=20.0,
+    negative_bar_length_mm=30.0,
+)
+
+# Field order the YAML has always been written in (after "name")
+_DESIGN_KEY_ORDER = tuple(f.name for f in fields(ArrayDesignRec) if f.name != "name")
+
+
+def _float_input(prefix: str, field: str, label: str, step: float, value, **kw):
+    return float(
+        st.number_input(
+            label,
+            min_value=0.0,
+            value=float(value),
+            step=step,
+            format="%.2f",
+            key=f"{prefix}_{field}",
+            **kw,
+        )
+    )
+
+
+def _render_design_form(
+    prefix: str,
+    form_key: str,
+    submit_label: str,
+    current: ArrayDesignRec,
+    silver: _SilverChoices,
+    silver_options: Sequence[int],
+    silver_defaults: Dict[str, int],
+) -> Optional[ArrayDesign]:
+    """
+    The Add / Edit design form, driven by the field tables above.
 
-            col_cells = st.columns(3)
-            with col_cells[0]:
-                num_cells = st.number_input(
+    `silver_defaults` maps each Silver Ribbon field stem to the preselected
+    index into silver.items. Returns the design fields on a valid submit,
+    otherwise None.
+    """
+    with st.form(form_key):
+        if not silver.items:
+            st.error(
+                "No Silver Ribbon materials found. "
+                "Please add at least one Silver Ribbon item first."
+            )
+            st.form_submit_button(submit_label)
+            return None
+
+        values: ArrayDesign = {}
+        name = st.text_input("Design name", value=current.name, key=f"{prefix}_name")
+
+        col_cells = st.columns(3)
+        with col_cells[0]:
+            values["num_cells"] = int(
+                st.number_input(
                     "No. cells",
                     min_value=1,
-                    value=20,
+                    value=current.num_cells,
                     step=1,
-                    key="add_num_cells",
-                )
-            with col_cells[1]:
-                eff15 = st.number_input(
-                    "Efficiency AM1.5 (%)",
-                    min_value=0.0,
-                    max_value=100.0,
-                    value=30.0,
-                    step=0.1,
-                    format="%.2f",
-                    key="add_eff15",
+                    key=f"{prefix}_num_cells",
                 )
-            with col_cells[2]:
-                eff0 = st.number_input(
-                    "Efficiency AM0 (%)",
-                    min_value=0.0,
-                    max_value=100.0,
-                    value=31.0,
-                    step=0.1,
-                    format="%.2f",
-                    key="add_eff0",
+            )
+        for col, (field, label, step) in zip(col_cells[1:], _EFFICIENCY_FIELDS):
+            with col:
+                values[field] = _float_input(
+                    prefix, field, label, step, getattr(current, field), max_value=100.0
                 )
 
-            # Geometry
-            st.markdown("#### Geometry (mm)")
-            col_geom = st.columns(4)
-            with col_geom[0]:
-                cell_height = st.number_input(
-                    "Cell height (mm)",
-                    min_value=0.0,
-                    value=6.6,
-                    step=0.1,
-                    format="%.2f",
-                    key="add_cell_height",
-                )
-            with col_geom[1]:
-                gap = st.number_input(
-                    "Gap between cells (mm)",
-                    min_value=0.0,
-                    value=1.0,
-                    step=0.1,
-                    format="%.2f",
-                    key="add_gap",
-                )
-            with col_geom[2]:
-                pos_gap = st.number_input(
-                    "Positive end gap (mm)",
-                    min_value=0.0,
-                    value=5.0,
-                    step=0.1,
-                    format="%.2f",
-                    key="add_pos_gap",
-                )
-            with col_geom[3]:
-                neg_gap = st.number_input(
-                    "Negative end gap (mm)",
-                    min_value=0.0,
-                    value=5.0,
-                    step=0.1,
-                    format="%.2f",
-                    key="add_neg_gap",
+        st.markdown("#### Geometry (mm)")
+        for col, (field, label, step) in zip(st.columns(4), _GEOMETRY_FIELDS):
+            with col:
+                values[field] = _float_input(
+                    prefix, field, label, step, getattr(current, field)
                 )
 
-            # Blocking diode tabs
-            st.markdown("#### Blocking Diode Tabs")
+        format_func = silver.labels.__getitem__
+        for heading, select_label, stem, lengths in _SILVER_SECTIONS:
+            st.markdown(heading)
+            idx = st.selectbox(
+                select_label,
+                silver_options,
+                index=silver_options.index(silver_defaults[stem]),
+                format_func=format_func,
+                key=f"{prefix}_{stem}_silver",
+            )
+            item = silver.items[idx]
+            values[f"{stem}_silver_id"] = item.get("id", "")
+            values[f"{stem}_width_mm"] = float(item.get("width_mm", 0.0))
+
+            cols = st.columns(len(lengths)) if len(lengths) > 1 else [nullcontext()]
+            for col, (field, label, step) in zip(cols, lengths):
+                with col:
+                    values[field] = _float_input(
+                        prefix, field, label, step, getattr(current, field)
+                    )
 
-            if not silver_items:
-                st.error(
-                    "No Silver Ribbon materials found. "
-                    "Please add at least one Silver Ribbon item first."
-                )
-                submitted = st.form_submit_button("Add Array Design")
-                if submitted:
-                    st.stop()
-            else:
-                labels = _silver_labels(silver_items)
-                sel_block = st.selectbox(
-                    "Blocking diode tab width (Silver Ribbon)",
-                    labels,
-                    index=0,
-                    key="add_block_silver",
-                )
-                block_idx = int(sel_block.split(":", 1)[0])
-                block_item = silver_items[block_idx]
-
-            col_tabs = st.columns(2)
-            with col_tabs[0]:
-                block_len1 = st.number_input(
-                    "Tab length 1 (mm)",
-                    min_value=0.0,
-                    value=10.0,
-                    step=0.5,
-                    format="%.2f",
-                    key="add_block_len1",
-                )
-            with col_tabs[1]:
-                block_len2 = st.number_input(
-                    "Tab length 2 (mm)",
-                    min_value=0.0,
-                    value=10.0,
-                    step=0.5,
-                    format="%.2f",
-                    key="add_block_len2",
-                )
+        if not st.form_submit_button(submit_label):
+            return None
+        if not name.strip():
+            st.error("Please enter a design name.")
+            return None
 
-            # Negative end bar
-            st.markdown("#### Negative End Bar")
-            sel_neg_end = st.selectbox(
-                "Negative end width (Silver Ribbon)",
-                labels,
-                index=0,
-                key="add_neg_end_silver",
-            )
-            neg_end_idx = int(sel_neg_end.split(":", 1)[0])
-            neg_end_item = silver_items[neg_end_idx]
+    return {"name": name.strip(), **{k: values[k] for k in _DESIGN_KEY_ORDER}}
 
-            neg_end_len = st.number_input(
-                "Negative end length (mm) (doubled later – two bars)",
-                min_value=0.0,
-                value=20.0,
-                step=0.5,
-                format="%.2f",
-                key="add_neg_end_len",
-            )
 
-            # Negative bar
-            st.markdown("#### Negative Bar")
-            sel_neg_bar = st.selectbox(
-                "Negative bar width (Silver Ribbon)",
-                labels,
-                index=0,
-                key="add_neg_bar_silver",
-            )
-            neg_bar_idx = int(sel_neg_bar.split(":", 1)[0])
-            neg_bar_item = silver_items[neg_bar_idx]
-
-            neg_bar_len = st.number_input(
-                "Negative bar length (mm)",
-                min_value=0.0,
-                value=30.0,
-                step=0.5,
-                format="%.2f",
-                key="add_neg_bar_len",
+@st.fragment
+def _render_add(designs, silver: _SilverChoices) -> None:
+    silver_items = silver.items
+    with st.expander("➕ Add new Array Design", expanded=False):
+        _show_flash("add")
+        silver_options = _silver_options(
+            silver_items, _silver_filter(silver_items, "add_silver_filter")
+        )
+        first = silver_options[0] if silver_items else 0
+        new_design = _render_design_form(
+            "add",
+            "add_design",
+            "Add Array Design",
+            _NEW_DESIGN_DEFAULTS,
+            silver,
+            silver_options,
+            {stem: first for _, _, stem, _ in _SILVER_SECTIONS},
+        )
+        if new_design is not None:
+            designs.append(new_design)
+            _save_session_designs(designs)
+            _flash_and_rerun("add", "success", "Array design added successfully ✅")
+
+
+@st.fragment
+def _render_edit(designs, silver: _SilverChoices) -> None:
+    silver_items = silver.items
+    with st.expander("✏️ Edit existing Array Design", expanded=False):
+        _show_flash("edit")
+        labels_designs = _design_labels(designs)
+        edit_idx = st.selectbox(
+            "Select design to edit",
+            range(len(designs)),
+            format_func=labels_designs.__getitem__,
+            key="edit_select_design",
+        )
+        design = designs[edit_idx]
+        rec = ArrayDesignRec.from_dict(design)
+
+        silver_defaults = {
+            stem: silver.index_by_id.get(str(getattr(rec, f"{stem}_silver_id")), 0)
+            for _, _, stem, _ in _SILVER_SECTIONS
+        }
+        silver_options = _silver_options(
+            silver_items,
+            _silver_filter(silver_items, "edit_silver_filter"),
+            keep=silver_defaults.values(),
+        )
+
+        updated = _render_design_form(
+            "edit",
+            "edit_design_form",
+            "Save changes",
+            rec,
+            silver,
+            silver_options,
+            silver_defaults,
+        )
+        if updated is not None:
+            design.update(updated)
+            _save_session_designs(designs)
+            _flash_and_rerun("edit", "success", "Array design updated ✅")
+
+
+@st.fragment
+def _render_delete(designs) -> None:
+    with st.expander("🗑️ Delete Array Design", expanded=False):
+        _show_flash("delete")
+        labels_designs = _design_labels(designs)
+        del_idx = st.selectbox(
+            "Select design to delete",
+            range(len(designs)),
+            format_func=labels_designs.__getitem__,
+            key="delete_select_design",
+        )
+
+        if st.button("Delete selected design"):
+            removed = designs.pop(del_idx)
+            _save_session_designs(designs)
+            _flash_and_rerun(
+                "delete",
+                "warning",
+                f"Deleted design: {removed.get('name', '(no name)')}",
             )
 
-            submitted = st.form_submit_button("Add Array Design")
-
-            if submitted:
-                if not name.strip():
-                    st.error("Please enter a design name.")
-                else:
-                    new_design: ArrayDesign = {
-                        "name": name.strip(),
-                        "num_cells": int(num_cells),
-                        "eff_am15_percent": float(eff15),
-                        "eff_am0_percent": float(eff0),
-                        "cell_height_mm": float(cell_height),
-                        "gap_between_cells_mm": float(gap),
-                        "positive_end_gap_mm": float(pos_gap),
-                        "negative_end_gap_mm": float(neg_gap),
-                        "blocking_tab_silver_id": block_item.get("id", ""),
-                        "blocking_tab_width_mm": float(block_item.get("width_mm", 0.0)),
-                        "blocking_tab_length1_mm": float(block_len1),
-                        "blocking_tab_length2_mm": float(block_len2),
-                        "negative_end_silver_id": neg_end_item.get("id", ""),
-                        "negative_end_width_mm": float(
-                            neg_end_item.get("width_mm", 0.0)
-                        ),
-                        "negative_end_length_mm": float(neg_end_len),
-                        "negative_bar_silver_id": neg_bar_item.get("id", ""),
-                        "negative_bar_width_mm": float(
-                            neg_bar_item.get("width_mm", 0.0)
-                        ),
-                        "negative_bar_length_mm": float(neg_bar_len),
-                    }
-
-                    designs.append(new_design)
-                    save_array_designs(designs)
-                    st.success("Array design added successfully ✅")
-                    st.rerun()
-
-    # =========================================================
-    #   EDIT EXISTING DESIGN
-    # =========================================================
-    if designs:
-        st.markdown("---")
-        with st.expander("✏️ Edit existing Array Design", expanded=False):
-            labels_designs = [
-                f"{i}: {d.get('name', '(no name)')} – {d.get('num_cells', '?')} cells"
-                for i, d in enumerate(designs)
-            ]
-            sel_design = st.selectbox(
-                "Select design to edit",
-                labels_designs,
-                key="edit_select_design",
-            )
-            edit_idx = int(sel_design.split(":", 1)[0])
-            design = designs[edit_idx]
-
-            with st.form("edit_design_form"):
-                name = st.text_input(
-                    "Design name",
-                    value=design.get("name", ""),
-                    key="edit_name",
-                )
 
-                col_cells = st.columns(3)
-                with col_cells[0]:
-                    num_cells = st.number_input(
-                        "No. cells",
-                        min_value=1,
-                        value=int(design.get("num_cells", 1)),
-                        step=1,
-                        key="edit_num_cells",
-                    )
-                with col_cells[1]:
-                    eff15 = st.number_input(
-                        "Efficiency AM1.5 (%)",
-                        min_value=0.0,
-                        max_value=100.0,
-                        value=float(design.get("eff_am15_percent", 0.0)),
-                        step=0.1,
-                        format="%.2f",
-                        key="edit_eff15",
-                    )
-                with col_cells[2]:
-                    eff0 = st.number_input(
-                        "Efficiency AM0 (%)",
-                        min_value=0.0,
-                        max_value=100.0,
-                        value=float(design.get("eff_am0_percent", 0.0)),
-                        step=0.1,
-                        format="%.2f",
-                        key="edit_eff0",
-                    )
+def render() -> None:
+    st.title("Array Designs")
 
-                # Geometry
-                st.markdown("#### Geometry (mm)")
-                col_geom = st.columns(4)
-                with col_geom[0]:
-                    cell_height = st.number_input(
-                        "Cell height (mm)",
-                        min_value=0.0,
-                        value=float(design.get("cell_height_mm", 0.0)),
-                        step=0.1,
-                        format="%.2f",
-                        key="edit_cell_height",
-                    )
-                with col_geom[1]:
-                    gap = st.number_input(
-                        "Gap between cells (mm)",
-                        min_value=0.0,
-                        value=float(design.get("gap_between_cells_mm", 0.0)),
-                        step=0.1,
-                        format="%.2f",
-                        key="edit_gap",
-                    )
-                with col_geom[2]:
-                    pos_gap = st.number_input(
-                        "Positive end gap (mm)",
-                        min_value=0.0,
-                        value=float(design.get("positive_end_gap_mm", 0.0)),
-                        step=0.1,
-                        format="%.2f",
-                        key="edit_pos_gap",
-                    )
-                with col_geom[3]:
-                    neg_gap = st.number_input(
-                        "Negative end gap (mm)",
-                        min_value=0.0,
-                        value=float(design.get("negative_end_gap_mm", 0.0)),
-                        step=0.1,
-                        format="%.2f",
-                        key="edit_neg_gap",
-                    )
+    st.markdown(
+        """
+        Define different array designs here. Each design specifies:
 
-                # Blocking tabs
-                st.markdown("#### Blocking Diode Tabs")
+        1. **Number of cells**  
+        2. **Cell efficiency at AM1.5 and AM0** (20 cm² cells → power per cell and per array)  
+        3. **Cell height and gaps**  
+        4. **End gaps**  
+        5. **Blocking diode tabs** – *lengths + Silver Ribbon width*  
+        6. **Negative end bars** – *Silver width + length*  
+        7. **Negative bars** – *Silver width + length*
+        """
+    )
 
-                if not silver_items:
-                    st.error(
-                        "No Silver Ribbon materials found. "
-                        "Please add at least one Silver Ribbon item first."
-                    )
-                    save_changes = st.form_submit_button("Save changes")
-                    if save_changes:
-                        st.stop()
-                else:
-                    labels = _silver_labels(silver_items)
-                    prev_block_id = design.get("blocking_tab_silver_id", "")
-                    default_block_idx = _find_silver_index_by_id(
-                        silver_items, prev_block_id
-                    )
-                    sel_block = st.selectbox(
-                        "Blocking diode tab width (Silver Ribbon)",
-                        labels,
-                        index=default_block_idx,
-                        key="edit_block_silver",
-                    )
-                    block_idx = int(sel_block.split(":", 1)[0])
-                    block_item = silver_items[block_idx]
-
-                col_tabs = st.columns(2)
-                with col_tabs[0]:
-                    block_len1 = st.number_input(
-                        "Tab length 1 (mm)",
-                        min_value=0.0,
-                        value=float(design.get("blocking_tab_length1_mm", 0.0)),
-                        step=0.5,
-                        format="%.2f",
-                        key="edit_block_len1",
-                    )
-                with col_tabs[1]:
-                    block_len2 = st.number_input(
-                        "Tab length 2 (mm)",
-                        min_value=0.0,
-                        value=float(design.get("blocking_tab_length2_mm", 0.0)),
-                        step=0.5,
-                        format="%.2f",
-                        key="edit_block_len2",
-                    )
+    # Session-owned list: the add/edit/delete fragments mutate it in place
+    # and save.
+    designs = _session_designs()
+    materials_db = cached_materials()
+    # Shared by the add and edit fragments; labels are built lazily
+    silver = _SilverChoices(materials_db.get("Silver Ribbon", []))
 
-                # Negative end bar
-                st.markdown("#### Negative End Bar")
-                prev_neg_end_id = design.get("negative_end_silver_id", "")
-                default_neg_end_idx = _find_silver_index_by_id(
-                    silver_items, prev_neg_end_id
-                )
-                sel_neg_end = st.selectbox(
-                    "Negative end width (Silver Ribbon)",
-                    labels,
-                    index=default_neg_end_idx,
-                    key="edit_neg_end_silver",
-                )
-                neg_end_idx = int(sel_neg_end.split(":", 1)[0])
-                neg_end_item = silver_items[neg_end_idx]
-
-                neg_end_len = st.number_input(
-                    "Negative end length (mm) (doubled later – two bars)",
-                    min_value=0.0,
-                    value=float(design.get("negative_end_length_mm", 0.0)),
-                    step=0.5,
-                    format="%.2f",
-                    key="edit_neg_end_len",
-                )
+    # ------------------ SHOW EXISTING DESIGNS ------------------
+    st.markdown("### Existing Array Designs")
 
-                # Negative bar
-                st.markdown("#### Negative Bar")
-                prev_neg_bar_id = design.get("negative_bar_silver_id", "")
-                default_neg_bar_idx = _find_silver_index_by_id(
-                    silver_items, prev_neg_bar_id
-                )
-                sel_neg_bar = st.selectbox(
-                    "Negative bar width (Silver Ribbon)",
-                    labels,
-                    index=default_neg_bar_idx,
-                    key="edit_neg_bar_silver",
-                )
-                neg_bar_idx = int(sel_neg_bar.split(":", 1)[0])
-                neg_bar_item = silver_items[neg_bar_idx]
-
-                neg_bar_len = st.number_input(
-                    "Negative bar length (mm)",
-                    min_value=0.0,
-                    value=float(design.get("negative_bar_length_mm", 0.0)),
-                    step=0.5,
-                    format="%.2f",
-                    key="edit_neg_bar_len",
-                )
+    _render_designs_table(designs)
+
+    st.markdown("---")
+
+    _render_add(designs, silver)
 
-                save_changes = st.form_submit_button("Save changes")
-
-                if save_changes:
-                    if not name.strip():
-                        st.error("Please enter a design name.")
-                    else:
-                        design["name"] = name.strip()
-                        design["num_cells"] = int(num_cells)
-                        design["eff_am15_percent"] = float(eff15)
-                        design["eff_am0_percent"] = float(eff0)
-                        design["cell_height_mm"] = float(cell_height)
-                        design["gap_between_cells_mm"] = float(gap)
-                        design["positive_end_gap_mm"] = float(pos_gap)
-                        design["negative_end_gap_mm"] = float(neg_gap)
-                        design["blocking_tab_silver_id"] = block_item.get("id", "")
-                        design["blocking_tab_width_mm"] = float(
-                            block_item.get("width_mm", 0.0)
-                        )
-                        design["blocking_tab_length1_mm"] = float(block_len1)
-                        design["blocking_tab_length2_mm"] = float(block_len2)
-                        design["negative_end_silver_id"] = neg_end_item.get("id", "")
-                        design["negative_end_width_mm"] = float(
-                            neg_end_item.get("width_mm", 0.0)
-                        )
-                        design["negative_end_length_mm"] = float(neg_end_len)
-                        design["negative_bar_silver_id"] = neg_bar_item.get("id", "")
-                        design["negative_bar_width_mm"] = float(
-                            neg_bar_item.get("width_mm", 0.0)
-                        )
-                        design["negative_bar_length_mm"] = float(neg_bar_len)
-
-                        designs[edit_idx] = design
-                        save_array_designs(designs)
-                        st.success("Array design updated ✅")
-                        st.rerun()
-
-    # =========================================================
-    #   DELETE DESIGN
-    # =========================================================
     if designs:
         st.markdown("---")
-        with st.expander("🗑️ Delete Array Design", expanded=False):
-            labels_designs = [
-                f"{i}: {d.get('name', '(no name)')} – {d.get('num_cells', '?')} cells"
-                for i, d in enumerate(designs)
-            ]
-            sel_design = st.selectbox(
-                "Select design to delete",
-                labels_designs,
-                key="delete_select_design",
-            )
-            del_idx = int(sel_design.split(":", 1)[0])
+        _render_edit(designs, silver)
 
-            if st.button("Delete selected design"):
-                removed = designs.pop(del_idx)
-                save_array_designs(designs)
-                st.warning(
-                    f"Deleted design: {removed.get('name', '(no name)')}"
-                )
-                st.rerun()
+    if designs:
+        st.markdown("---")
+        _render_delete(designs)
@@ -1,13 +1,18 @@
 import streamlit as st
 
-from model import load_product
+from cached_loaders import cached_product
 
 
 def render() -> None:
     """Cost page – for now just shows core inputs and derived geometry."""
     st.title("Cost per Array")
 
-    product = load_product()
+    product = cached_product()
+
+    # String length in each unit, derived once (multiplies, not divisions)
+    length_mm = product.total_string_length_mm
+    length_cm = length_mm * 0.1
+    length_m = length_mm * 0.001
 
     st.subheader("Product Summary")
 
@@ -22,15 +27,15 @@ def render() -> None:
     with col2:
         st.metric(
             "String length (mm)",
-            value=f"{product.total_string_length_mm:.2f}",
+            value=f"{length_mm:.2f}",
         )
         st.metric(
             "String length (cm)",
-            value=f"{product.total_string_length_mm / 10.0:.2f}",
+            value=f"{length_cm:.2f}",
         )
         st.metric(
             "String length (m)",
-            value=f"{product.total_string_length_mm / 1000.0:.3f}",
+            value=f"{length_m:.3f}",
         )
         st.metric(
             "Exchange rate (GBP per USD)",
@@ -1,19 +1,41 @@
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
 import streamlit as st
 
-from model import (
-    load_materials,
-    load_array_designs,
-    load_product,
-    MaterialItem,
+from cached_loaders import (
+    cached_array_design_recs_by_name,
+    cached_material_recs,
+    cached_materials,
+    cached_product,
+    file_mtime_ns,
 )
+from model import MATERIALS_FILE, SilverRibbonRec, UnitCostRec
 from pages.array_designs import compute_power_for_design
 
 
 # ------------------------ HELPERS ------------------------
 
+# mm (width) x mm (thickness) x 1 mm (length) = 1e-3 cm^3, so grams per mm of
+# ribbon is width_mm * thickness_mm * density_g_cm3 * this factor.
+GRAMS_PER_MM_FACTOR = 1e-3
+
+# Guards the yield division; the yield sliders bottom out at 50%, so it never
+# actually bites.
+MIN_YIELD_FRACTION = 1e-12
+
+
+# Records come from cached_material_recs(): numbers are already floats and
+# currency codes upper case, and render() coerces the exchange rate to float
+# once before passing it in. Frozen records are hashable, so the pricing
+# helpers are memoised on (record, exchange rate) directly.
 
+
+@lru_cache(maxsize=256)
 def get_silver_cost_per_mm(
-    silver_item: MaterialItem,
+    silver_item: SilverRibbonRec,
     exchange_rate_gbp_per_usd: float,
     override_width_mm: float | None = None,
 ) -> float:
@@ -23,100 +45,177 @@ def get_silver_cost_per_mm(
     If override_width_mm is provided, that width is used instead of the
     width stored in the silver item (useful for diode tabs with custom width).
     """
-    try:
-        price_per_g = float(silver_item.get("price_per_g", 0))
-        currency = (silver_item.get("price_currency", "USD") or "USD").upper()
-        width_mm = float(
-            override_width_mm
-            if override_width_mm is not None
-            else silver_item.get("width_mm", 0)
-        )
-        thickness_mm = float(silver_item.get("thickness_mm", 0))
-        density_g_cm3 = float(silver_item.get("density_g_cm3", 0))
-    except Exception:
-        return 0.0
+    width_mm = (
+        float(override_width_mm)
+        if override_width_mm is not None
+        else silver_item.width_mm
+    )
+    thickness_mm = silver_item.thickness_mm
+    density_g_cm3 = silver_item.density_g_cm3
 
     if width_mm <= 0 or thickness_mm <= 0 or density_g_cm3 <= 0:
         return 0.0
 
     # Convert price to GBP
-    if currency == "USD":
-        price_per_g_gbp = price_per_g * float(exchange_rate_gbp_per_usd)
+    if silver_item.price_currency == "USD":
+        price_per_g_gbp = silver_item.price_per_g * exchange_rate_gbp_per_usd
     else:
-        price_per_g_gbp = price_per_g
-
-    # Geometry conversion:
-    # width_mm -> cm, thickness_mm -> cm, length = 1 mm -> 0.1 cm
-    width_cm = width_mm / 10.0
-    thickness_cm = thickness_mm / 10.0
-    length_cm = 0.1  # 1 mm
+        price_per_g_gbp = silver_item.price_per_g
 
-    volume_cm3_per_mm = width_cm * thickness_cm * length_cm
-    grams_per_mm = volume_cm3_per_mm * density_g_cm3
+    grams_per_mm = width_mm * thickness_mm * density_g_cm3 * GRAMS_PER_MM_FACTOR
 
     return grams_per_mm * price_per_g_gbp
 
 
-def get_diode_price_gbp(diode_item: dict, exchange_rate_gbp_per_usd: float) -> float:
+@lru_cache(maxsize=256)
+def get_unit_cost_gbp(item: UnitCostRec, exchange_rate_gbp_per_usd: float) -> float:
+    """
+    Unit cost in GBP for a diode or weld head record.
+
+    The currency only picks which price field to read and the multiplier to
+    apply to it (the exchange rate for USD, 1 for GBP).
+    """
+    if item.currency == "USD":
+        unit_cost, fx = item.unit_cost_usd, exchange_rate_gbp_per_usd
+    else:
+        unit_cost, fx = item.unit_cost_gbp, 1.0
+    return 0.0 if unit_cost is None else unit_cost * fx
+
+
+def get_diode_price_gbp(
+    diode_item: UnitCostRec, exchange_rate_gbp_per_usd: float
+) -> float:
     """Return diode price in GBP (unit price) from materials entry."""
-    currency = (diode_item.get("currency", "USD") or "USD").upper()
-
-    try:
-        if currency == "USD":
-            unit_cost_usd = diode_item.get("unit_cost_usd", None)
-            if unit_cost_usd is None:
-                return 0.0
-            return float(unit_cost_usd) * float(exchange_rate_gbp_per_usd)
-        else:
-            unit_cost_gbp = diode_item.get("unit_cost_gbp", None)
-            if unit_cost_gbp is None:
-                return 0.0
-            return float(unit_cost_gbp)
-    except (TypeError, ValueError):
-        return 0.0
+    return get_unit_cost_gbp(diode_item, exchange_rate_gbp_per_usd)
 
 
 def get_weld_cost_per_weld(
-    weld_item: dict, exchange_rate_gbp_per_usd: float
+    weld_item: UnitCostRec, exchange_rate_gbp_per_usd: float
 ) -> float:
     """
     Compute cost per weld in GBP for a weld head.
 
     unit_cost / num_welds
     """
-    currency = (weld_item.get("currency", "USD") or "USD").upper()
-    try:
-        num_welds = float(weld_item.get("num_welds", 0))
-    except (TypeError, ValueError):
+    if weld_item.num_welds <= 0:
         return 0.0
+    total_cost_gbp = get_unit_cost_gbp(weld_item, exchange_rate_gbp_per_usd)
+    return total_cost_gbp / weld_item.num_welds
+
+
+@dataclass(slots=True, frozen=True)
+class DiodeLineCost:
+    """Per-diode cost breakdown (GBP) for one diode type, plus the line total."""
+
+    silver: float
+    weld: float
+    raw: float
+    effective: float
+    total: float
+
+
+@lru_cache(maxsize=256)
+def diode_line_cost(
+    diode_price_gbp: float,
+    silver_cost_per_mm: float,
+    tab_length_mm: float,
+    weld_cost_gbp: float,
+    yield_fraction: float,
+    num_diodes: int,
+) -> DiodeLineCost:
+    """
+    Cost of one line of diodes (bypass or blocking).
 
-    if num_welds <= 0:
-        return 0.0
+    Pure in its scalar inputs, so reruns where only unrelated widgets changed
+    reuse the previous breakdown.
+    """
+    silver = silver_cost_per_mm * tab_length_mm
+    raw = diode_price_gbp + silver + weld_cost_gbp
+    effective = raw / max(yield_fraction, MIN_YIELD_FRACTION)
+    return DiodeLineCost(
+        silver=silver,
+        weld=weld_cost_gbp,
+        raw=raw,
+        effective=effective,
+        total=effective * num_diodes,
+    )
 
-    try:
-        if currency == "USD":
-            unit_cost_usd = weld_item.get("unit_cost_usd", None)
-            if unit_cost_usd is None:
-                return 0.0
-            total_cost_gbp = float(unit_cost_usd) * float(exchange_rate_gbp_per_usd)
-        else:
-            unit_cost_gbp = weld_item.get("unit_cost_gbp", None)
-            if unit_cost_gbp is None:
-                return 0.0
-            total_cost_gbp = float(unit_cost_gbp)
-    except (TypeError, ValueError):
-        return 0.0
 
-    return total_cost_gbp / num_welds
+def bypass_cost_matrix(
+    diode_items: list[UnitCostRec],
+    silver_items: list[SilverRibbonRec],
+    exchange_rate_gbp_per_usd: float,
+    tab_length_mm: float,
+    tab_width_mm: float,
+    weld_cost_gbp: float,
+    yield_fraction: float,
+    num_diodes: int,
+) -> np.ndarray:
+    """
+    Total bypass diode cost (GBP) for every diode x silver combination.
+
+    Returns an (n_diodes, n_silver) array; each cell matches what
+    diode_line_cost(...).total gives for that pair.
+    """
+    diode_price = np.array(
+        [get_diode_price_gbp(d, exchange_rate_gbp_per_usd) for d in diode_items],
+        dtype=float,
+    )
+    silver_per_mm = np.array(
+        [
+            get_silver_cost_per_mm(
+                s, exchange_rate_gbp_per_usd, override_width_mm=tab_width_mm
+            )
+            for s in silver_items
+        ],
+        dtype=float,
+    )
+
+    raw = diode_price[:, None] + silver_per_mm[None, :] * tab_length_mm + weld_cost_gbp
+    return raw / max(yield_fraction, MIN_YIELD_FRACTION) * num_diodes
 
 
-def find_material_by_id(items: list[dict], mat_id: str | None) -> dict | None:
-    if not mat_id:
-        return None
+def index_by_id(items: list) -> dict:
+    """Map id -> material record (first occurrence wins)."""
+    index: dict = {}
     for item in items:
-        if str(item.get("id", "")) == str(mat_id):
-            return item
-    return None
+        index.setdefault(item.id, item)
+    return index
+
+
+@lru_cache(maxsize=4)
+def _option_labels(
+    materials_mtime_ns: int,
+) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """
+    (diode labels, silver labels) for the selectboxes, one per item.
+
+    Keyed on the materials file version, so the strings are built once per
+    edit instead of by format_func on every rerun.
+    """
+    materials = cached_materials()
+    diode_labels = tuple(
+        f"{i}: {d.get('id', '(no id)')} – {d.get('name', '(no name)')}"
+        for i, d in enumerate(materials.get("Diodes", []))
+    )
+    silver_labels = tuple(
+        f"{i}: {s.get('id', '(no id)')} – {s.get('name', '(no name)')} "
+        f"({s.get('width_mm', '?')} mm)"
+        for i, s in enumerate(materials.get("Silver Ribbon", []))
+    )
+    return diode_labels, silver_labels
+
+
+def _sync_state(state: dict, **values) -> None:
+    """
+    Copy widget values into cost_diodes_state, writing only what changed.
+
+    Summary and Home read the diode settings from that dict, since widget
+    state is dropped once this page is no longer rendered.
+    """
+    for key, value in values.items():
+        if state.get(key) != value:
+            state[key] = value
 
 
 # ------------------------ MAIN RENDER ------------------------
@@ -136,12 +235,12 @@ def render():
     illumination = st.session_state.get("selected_illumination", "AM1.5")
 
     # Load product (for exchange rate)
-    product = load_product()
-    exchange_rate = product.exchange_rate_gbp_per_usd
+    product = cached_product()
+    exchange_rate = float(product.exchange_rate_gbp_per_usd)
 
     # Load designs
-    designs = load_array_designs()
-    design = next((d for d in designs if d["name"] == selected_name), None)
+    # Typed records: the numeric fields are already floats/ints
+    design = cached_array_design_recs_by_name().get(selected_name)
 
     if design is None:
         st.error("Selected array design not found. Please re-select on Home page.")
@@ -152,7 +251,7 @@ def render():
     array_power = power["P_array_AM15_W"] if illumination == "AM1.5" else power["P_array_AM0_W"]
 
     # Cell count
-    num_cells = int(design.get("num_cells", 0))
+    num_cells = design.num_cells
     if num_cells <= 0:
         st.error("Array design has invalid number of cells.")
         return
@@ -160,10 +259,10 @@ def render():
     # ---------------------------------------------------------
     # Load materials
     # ---------------------------------------------------------
-    materials = load_materials()
-    diode_items = materials.get("Diodes", [])
-    silver_items = materials.get("Silver Ribbon", [])
-    weld_items = materials.get("Weld heads", [])
+    materials = cached_material_recs()
+    diode_items = materials["Diodes"]
+    silver_items = materials["Silver Ribbon"]
+    weld_items = materials["Weld heads"]
 
     if not diode_items:
         st.error("No diode materials found. Add some under Materials → Diodes.")
@@ -177,10 +276,13 @@ def render():
         st.error("No weld head materials found. Add some under Materials → Weld heads.")
         return
 
+    weld_by_id = index_by_id(weld_items)
+    silver_by_id = index_by_id(silver_items)
+
     # Weld heads we need
-    weld_head_al = find_material_by_id(weld_items, "Weld_Head_Al")
-    weld_head_au = find_material_by_id(weld_items, "Weld_Head_Au")
-    weld_head_bl = find_material_by_id(weld_items, "Weld_Head_BL")
+    weld_head_al = weld_by_id.get("Weld_Head_Al")
+    weld_head_au = weld_by_id.get("Weld_Head_Au")
+    weld_head_bl = weld_by_id.get("Weld_Head_BL")
 
     if weld_head_al is None or weld_head_au is None or weld_head_bl is None:
         st.error(
@@ -189,9 +291,15 @@ def render():
         )
         return
 
-    cost_per_weld_al = get_weld_cost_per_weld(weld_head_al, exchange_rate)
-    cost_per_weld_au = get_weld_cost_per_weld(weld_head_au, exchange_rate)
-    cost_per_weld_bl = get_weld_cost_per_weld(weld_head_bl, exchange_rate)
+    # Weld cost per diode doesn't depend on any widget: settle it up front.
+    # Bypass: 1 x Weld_Head_Al + 1 x Weld_Head_Au; blocking: 2 x Weld_Head_BL.
+    welds_per_blocking_diode = 2
+    weld_cost_per_bypass_diode = get_weld_cost_per_weld(
+        weld_head_al, exchange_rate
+    ) + get_weld_cost_per_weld(weld_head_au, exchange_rate)
+    weld_cost_per_blocking_diode = welds_per_blocking_diode * get_weld_cost_per_weld(
+        weld_head_bl, exchange_rate
+    )
 
     # ---------------------------------------------------------
     # Initialise defaults in session_state (only once)
@@ -209,16 +317,11 @@ def render():
 
     state = st.session_state["cost_diodes_state"]
 
-    # Shared labels
-    diode_labels = [
-        f"{i}: {d.get('id', '(no id)')} – {d.get('name', '(no name)')}"
-        for i, d in enumerate(diode_items)
-    ]
-    silver_labels = [
-        f"{i}: {s.get('id', '(no id)')} – {s.get('name', '(no name)')} "
-        f"({s.get('width_mm', '?')} mm)"
-        for i, s in enumerate(silver_items)
-    ]
+    # Shared labels: the selectboxes return the item index directly and look
+    # their label up in the per-file-version tuples
+    diode_labels, silver_labels = _option_labels(file_mtime_ns(MATERIALS_FILE))
+    diode_label = diode_labels.__getitem__
+    silver_label = silver_labels.__getitem__
 
     # ---------------------------------------------------------
     # BYPASS DIODES
@@ -233,56 +336,65 @@ def render():
         """
     )
 
-    bypass_choice = st.selectbox(
-        "Bypass diode material",
-        diode_labels,
-        index=min(state["bypass_diode_index"], len(diode_labels) - 1),
-        key="cost_diodes_bypass_diode",
-    )
-    bypass_idx = int(bypass_choice.split(":", 1)[0])
-    state["bypass_diode_index"] = bypass_idx
-    bypass_diode_item = diode_items[bypass_idx]
-    price_bypass_gbp = get_diode_price_gbp(bypass_diode_item, exchange_rate)
-
-    bypass_silver_choice = st.selectbox(
-        "Silver material for bypass diode tabs",
-        silver_labels,
-        index=min(state["bypass_silver_index"], len(silver_labels) - 1),
-        key="cost_diodes_bypass_silver",
-    )
-    bypass_silver_idx = int(bypass_silver_choice.split(":", 1)[0])
-    state["bypass_silver_index"] = bypass_silver_idx
-    bypass_silver_item = silver_items[bypass_silver_idx]
+    # Widgets sit in a form so tweaking several of them costs one rerun
+    with st.form("cost_diodes_bypass_form"):
+        bypass_idx = st.selectbox(
+            "Bypass diode material",
+            range(len(diode_items)),
+            format_func=diode_label,
+            index=min(state["bypass_diode_index"], len(diode_items) - 1),
+            key="cost_diodes_bypass_diode",
+        )
 
-    col_tabs_geom = st.columns(2)
-    with col_tabs_geom[0]:
-        tab_length_mm = st.number_input(
-            "Bypass tab length (mm)",
-            min_value=0.1,
-            step=0.1,
-            value=float(state["bypass_tab_length_mm"]),
-            key="cost_diodes_bypass_tab_length",
+        bypass_silver_idx = st.selectbox(
+            "Silver material for bypass diode tabs",
+            range(len(silver_items)),
+            format_func=silver_label,
+            index=min(state["bypass_silver_index"], len(silver_items) - 1),
+            key="cost_diodes_bypass_silver",
         )
-        state["bypass_tab_length_mm"] = tab_length_mm
-    with col_tabs_geom[1]:
-        tab_width_mm = st.number_input(
-            "Bypass tab width (mm)",
-            min_value=0.1,
-            step=0.1,
-            value=float(state["bypass_tab_width_mm"]),
-            key="cost_diodes_bypass_tab_width",
+
+        col_tabs_geom = st.columns(2)
+        with col_tabs_geom[0]:
+            tab_length_mm = st.number_input(
+                "Bypass tab length (mm)",
+                min_value=0.1,
+                step=0.1,
+                value=float(state["bypass_tab_length_mm"]),
+                key="cost_diodes_bypass_tab_length",
+            )
+        with col_tabs_geom[1]:
+            tab_width_mm = st.number_input(
+                "Bypass tab width (mm)",
+                min_value=0.1,
+                step=0.1,
+                value=float(state["bypass_tab_width_mm"]),
+                key="cost_diodes_bypass_tab_width",
+            )
+
+        bypass_yield_percent = st.slider(
+            "Bypass process yield (%)",
+            min_value=50,
+            max_value=100,
+            step=1,
+            value=int(state["bypass_yield_percent"]),
+            key="cost_diodes_bypass_yield",
         )
-        state["bypass_tab_width_mm"] = tab_width_mm
-
-    bypass_yield_percent = st.slider(
-        "Bypass process yield (%)",
-        min_value=50,
-        max_value=100,
-        step=1,
-        value=int(state["bypass_yield_percent"]),
-        key="cost_diodes_bypass_yield",
+
+        st.form_submit_button("Recalculate bypass diodes")
+
+    _sync_state(
+        state,
+        bypass_diode_index=bypass_idx,
+        bypass_silver_index=bypass_silver_idx,
+        bypass_tab_length_mm=tab_length_mm,
+        bypass_tab_width_mm=tab_width_mm,
+        bypass_yield_percent=bypass_yield_percent,
     )
-    state["bypass_yield_percent"] = bypass_yield_percent
+
+    bypass_diode_item = diode_items[bypass_idx]
+    price_bypass_gbp = get_diode_price_gbp(bypass_diode_item, exchange_rate)
+    bypass_silver_item = silver_items[bypass_silver_idx]
     bypass_yield = bypass_yield_percent / 100.0
 
     tabs_per_bypass_diode = 2
@@ -293,42 +405,59 @@ def render():
         exchange_rate_gbp_per_usd=exchange_rate,
         override_width_mm=tab_width_mm,
     )
-    silver_cost_per_bypass_diode = cost_per_mm_bypass_tab * total_tab_length_per_diode_mm
-
-    weld_cost_per_bypass_diode = cost_per_weld_al + cost_per_weld_au
-
-    raw_cost_per_bypass_diode = (
-        price_bypass_gbp + silver_cost_per_bypass_diode + weld_cost_per_bypass_diode
+    bypass = diode_line_cost(
+        price_bypass_gbp,
+        cost_per_mm_bypass_tab,
+        total_tab_length_per_diode_mm,
+        weld_cost_per_bypass_diode,
+        bypass_yield,
+        num_cells,
     )
 
-    if bypass_yield > 0:
-        effective_cost_per_bypass_diode = raw_cost_per_bypass_diode / bypass_yield
-    else:
-        effective_cost_per_bypass_diode = 0.0
-
-    total_bypass_cost = effective_cost_per_bypass_diode * num_cells
-
-    st.markdown("##### Per bypass diode (before yield):")
-    st.write(f"- Diode cost: **£{price_bypass_gbp:.2f}**")
-    st.write(
-        f"- Silver cost (2 tabs × {tab_length_mm:.2f} mm, width {tab_width_mm:.2f} mm): "
-        f"**£{silver_cost_per_bypass_diode:.2f}**"
-    )
-    st.write(
-        f"- Weld cost (1 × Weld_Head_Al + 1 × Weld_Head_Au): "
-        f"**£{weld_cost_per_bypass_diode:.2f}**"
+    # One markdown element per breakdown rather than one per line
+    st.markdown(
+        "\n".join(
+            [
+                "##### Per bypass diode (before yield):",
+                f"- Diode cost: **£{price_bypass_gbp:.2f}**",
+                f"- Silver cost (2 tabs × {tab_length_mm:.2f} mm, "
+                f"width {tab_width_mm:.2f} mm): **£{bypass.silver:.2f}**",
+                f"- Weld cost (1 × Weld_Head_Al + 1 × Weld_Head_Au): "
+                f"**£{bypass.weld:.2f}**",
+                f"- Raw cost per bypass diode: **£{bypass.raw:.2f}**",
+                "",
+                "##### Per bypass diode (after yield):",
+                f"- Yield: **{bypass_yield_percent}%** → effective cost per good "
+                f"bypass diode: **£{bypass.effective:.2f}**",
+                f"- Total for **{num_cells}** bypass diodes: "
+                f"**£{bypass.total:.2f}**",
+            ]
+        )
     )
-    st.write(f"- Raw cost per bypass diode: **£{raw_cost_per_bypass_diode:.2f}**")
 
-    st.markdown("##### Per bypass diode (after yield):")
-    st.write(
-        f"- Yield: **{bypass_yield_percent}%** → effective cost per good bypass diode: "
-        f"**£{effective_cost_per_bypass_diode:.2f}**"
-    )
-    st.write(
-        f"- Total for **{num_cells}** bypass diodes: "
-        f"**£{total_bypass_cost:.2f}**"
-    )
+    with st.expander("Compare all bypass diode / silver combinations", expanded=False):
+        comparison = bypass_cost_matrix(
+            diode_items,
+            silver_items,
+            exchange_rate,
+            total_tab_length_per_diode_mm,
+            tab_width_mm,
+            bypass.weld,
+            bypass_yield,
+            num_cells,
+        )
+        st.caption(
+            f"Total cost (£) of {num_cells} bypass diodes for each diode (rows) "
+            "and tab silver (columns), using the tab geometry and yield above."
+        )
+        st.dataframe(
+            pd.DataFrame(
+                comparison.round(2),
+                index=[d.id or "(no id)" for d in diode_items],
+                columns=[s.id or "(no id)" for s in silver_items],
+            ),
+            use_container_width=True,
+        )
 
     st.markdown("---")
 
@@ -349,23 +478,14 @@ def render():
 
     num_blocking_diodes = 2
 
-    blocking_choice = st.selectbox(
-        "Blocking diode material",
-        diode_labels,
-        index=min(state["blocking_diode_index"], len(diode_labels) - 1),
-        key="cost_diodes_blocking_diode",
-    )
-    blocking_idx = int(blocking_choice.split(":", 1)[0])
-    state["blocking_diode_index"] = blocking_idx
-    blocking_diode_item = diode_items[blocking_idx]
-    price_blocking_gbp = get_diode_price_gbp(blocking_diode_item, exchange_rate)
-
-    block_silver_id = design.get("blocking_tab_silver_id", "")
-    block_silver_width = float(design.get("blocking_tab_width_mm", 0.0))
-    block_len1_mm = float(design.get("blocking_tab_length1_mm", 0.0))
-    block_len2_mm = float(design.get("blocking_tab_length2_mm", 0.0))
+    block_silver_id = design.blocking_tab_silver_id
+    block_silver_width = design.blocking_tab_width_mm
+    block_len1_mm = design.blocking_tab_length1_mm
+    block_len2_mm = design.blocking_tab_length2_mm
 
-    blocking_silver_item = find_material_by_id(silver_items, block_silver_id)
+    blocking_silver_item = (
+        silver_by_id.get(str(block_silver_id)) if block_silver_id else None
+    )
 
     if blocking_silver_item is None:
         st.error(
@@ -374,15 +494,34 @@ def render():
         )
         return
 
-    blocking_yield_percent = st.slider(
-        "Blocking process yield (%)",
-        min_value=50,
-        max_value=100,
-        step=1,
-        value=int(state["blocking_yield_percent"]),
-        key="cost_diodes_blocking_yield",
+    with st.form("cost_diodes_blocking_form"):
+        blocking_idx = st.selectbox(
+            "Blocking diode material",
+            range(len(diode_items)),
+            format_func=diode_label,
+            index=min(state["blocking_diode_index"], len(diode_items) - 1),
+            key="cost_diodes_blocking_diode",
+        )
+
+        blocking_yield_percent = st.slider(
+            "Blocking process yield (%)",
+            min_value=50,
+            max_value=100,
+            step=1,
+            value=int(state["blocking_yield_percent"]),
+            key="cost_diodes_blocking_yield",
+        )
+
+        st.form_submit_button("Recalculate blocking diodes")
+
+    _sync_state(
+        state,
+        blocking_diode_index=blocking_idx,
+        blocking_yield_percent=blocking_yield_percent,
     )
-    state["blocking_yield_percent"] = blocking_yield_percent
+
+    blocking_diode_item = diode_items[blocking_idx]
+    price_blocking_gbp = get_diode_price_gbp(blocking_diode_item, exchange_rate)
     blocking_yield = blocking_yield_percent / 100.0
 
     total_blocking_tab_length_per_diode_mm = block_len1_mm + block_len2_mm
@@ -392,61 +531,49 @@ def render():
         exchange_rate_gbp_per_usd=exchange_rate,
         override_width_mm=block_silver_width,
     )
-    silver_cost_per_blocking_diode = (
-        cost_per_mm_blocking_tab * total_blocking_tab_length_per_diode_mm
-    )
-
-    welds_per_blocking_diode = 2
-    weld_cost_per_blocking_diode = welds_per_blocking_diode * cost_per_weld_bl
-
-    raw_cost_per_blocking_diode = (
-        price_blocking_gbp
-        + silver_cost_per_blocking_diode
-        + weld_cost_per_blocking_diode
-    )
-
-    if blocking_yield > 0:
-        effective_cost_per_blocking_diode = raw_cost_per_blocking_diode / blocking_yield
-    else:
-        effective_cost_per_blocking_diode = 0.0
-
-    total_blocking_cost = effective_cost_per_blocking_diode * num_blocking_diodes
-
-    st.markdown("##### Per blocking diode (before yield):")
-    st.write(f"- Diode cost: **£{price_blocking_gbp:.2f}**")
-    st.write(
-        f"- Silver cost (tabs {block_len1_mm:.2f} mm and {block_len2_mm:.2f} mm,"
-        f" width {block_silver_width:.2f} mm): "
-        f"**£{silver_cost_per_blocking_diode:.2f}**"
+    blocking = diode_line_cost(
+        price_blocking_gbp,
+        cost_per_mm_blocking_tab,
+        total_blocking_tab_length_per_diode_mm,
+        weld_cost_per_blocking_diode,
+        blocking_yield,
+        num_blocking_diodes,
     )
-    st.write(
-        f"- Weld cost (2 × Weld_Head_BL): "
-        f"**£{weld_cost_per_blocking_diode:.2f}**"
-    )
-    st.write(f"- Raw cost per blocking diode: **£{raw_cost_per_blocking_diode:.2f}**")
 
-    st.markdown("##### Per blocking diode (after yield):")
-    st.write(
-        f"- Yield: **{blocking_yield_percent}%** → effective cost per good blocking diode: "
-        f"**£{effective_cost_per_blocking_diode:.2f}**"
-    )
-    st.write(
-        f"- Total for **{num_blocking_diodes}** blocking diodes: "
-        f"**£{total_blocking_cost:2f}**"
+    st.markdown(
+        "\n".join(
+            [
+                "##### Per blocking diode (before yield):",
+                f"- Diode cost: **£{price_blocking_gbp:.2f}**",
+                f"- Silver cost (tabs {block_len1_mm:.2f} mm and "
+                f"{block_len2_mm:.2f} mm, width {block_silver_width:.2f} mm): "
+                f"**£{blocking.silver:.2f}**",
+                f"- Weld cost (2 × Weld_Head_BL): **£{blocking.weld:.2f}**",
+                f"- Raw cost per blocking diode: **£{blocking.raw:.2f}**",
+                "",
+                "##### Per blocking diode (after yield):",
+                f"- Yield: **{blocking_yield_percent}%** → effective cost per good "
+                f"blocking diode: **£{blocking.effective:.2f}**",
+                f"- Total for **{num_blocking_diodes}** blocking diodes: "
+                f"**£{blocking.total:.2f}**",
+            ]
+        )
     )
 
     st.markdown("---")
 
-    total_diode_cost = total_bypass_cost + total_blocking_cost
+    total_diode_cost = bypass.total + blocking.total
 
     st.subheader("Total Diode Cost")
 
-    st.write(f"**Total bypass diode cost:** £{total_bypass_cost:.2f}")
-    st.write(f"**Total blocking diode cost:** £{total_blocking_cost:.2f}")
-    st.write(f"**Total diode cost (bypass + blocking): £{total_diode_cost:.2f}**")
-
+    totals = [
+        f"**Total bypass diode cost:** £{bypass.total:.2f}",
+        f"**Total blocking diode cost:** £{blocking.total:.2f}",
+        f"**Total diode cost (bypass + blocking): £{total_diode_cost:.2f}**",
+    ]
     if array_power > 0:
-        st.write(
+        totals.append(
             f"**Cost per watt ({illumination}):** "
-            f"£{(total_diode_cost / array_power):2f} per W"
+            f"£{(total_diode_cost / array_power):.2f} per W"
         )
+    st.markdown("\n\n".join(totals))
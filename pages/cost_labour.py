@@ -1,10 +1,17 @@
+from functools import lru_cache
+
+import numpy as np
 import streamlit as st
 import pandas as pd
 
+from cached_loaders import (
+    cached_operator_profiles,
+    cached_process_steps,
+    file_mtime_ns,
+)
 from labour_model import (
-    load_process_steps,
+    OPERATOR_PROFILES_PATH,
     save_process_steps,
-    load_operator_profiles,
     save_operator_profiles,
 )
 
@@ -25,18 +32,357 @@ ENTRY_MODE_LABELS = {
 
 TIME_UNITS = ["seconds", "minutes"]
 
+# Text columns of the operator profiles editor
+_OPERATOR_TEXT_COLUMNS = ("id", "name", "job_title")
 
-def _safe_rerun():
-    try:
-        st.rerun()
-    except AttributeError:
-        st.experimental_rerun()
+# Option -> selectbox index; also the membership test when validating steps
+_LEVEL_IDX = {v: i for i, v in enumerate(LEVEL_OPTIONS)}
+_TIMING_BASIS_IDX = {v: i for i, v in enumerate(TIMING_BASIS_OPTIONS)}
+_ENTRY_MODE_IDX = {v: i for i, v in enumerate(ENTRY_MODES)}
+_TIME_UNIT_IDX = {v: i for i, v in enumerate(TIME_UNITS)}
+
+# Seconds per time unit; anything unrecognised is taken as seconds
+_SECONDS_PER_UNIT = {"seconds": 1.0, "minutes": 60.0}
+
+# Session-state buffer of (rebuilt step, summary row) by step position
+_STEP_BUF_KEY = "_labour_step_buf"
+
+# Summaries up to this many rows are sent as a static HTML table instead of
+# an interactive dataframe
+_HTML_SUMMARY_MAX_ROWS = 500
+
+
+@lru_cache(maxsize=4)
+def _operator_labels(profiles_mtime_ns: int) -> dict:
+    """
+    Operator id -> multiselect label, in file order.
+
+    Keyed on the profiles file version, so the labels are formatted once per
+    save rather than on every rerun. Treat the returned dict as read-only.
+    """
+    return {
+        op.id: f"{op.name} (£{op.hourly_rate:.2f}/hr)"
+        for op in cached_operator_profiles().values()
+    }
+
+
+def _operator_frame(operators) -> pd.DataFrame:
+    """Operator profiles as a column-typed DataFrame for the editor."""
+    ops = list(operators)
+    frame = {
+        col: pd.array([getattr(op, col) for op in ops], dtype="string")
+        for col in _OPERATOR_TEXT_COLUMNS
+    }
+    frame["hourly_rate"] = np.fromiter(
+        (op.hourly_rate for op in ops), dtype=np.float64, count=len(ops)
+    )
+    return pd.DataFrame(frame)
+
+
+def _operator_records(op_df: pd.DataFrame) -> list:
+    """
+    Editor rows back to plain dicts for saving.
+
+    Empty text cells come back as pd.NA, which YAML can't represent, so they
+    are saved as None (what the old object columns gave). A missing rate
+    stays NaN, which load_operator_profiles still reads as a float.
+    """
+    op_df = op_df.copy()
+    for col in _OPERATOR_TEXT_COLUMNS:
+        op_df[col] = op_df[col].astype(object).where(op_df[col].notna(), None)
+    return op_df.to_dict(orient="records")
+
+
+def _time_unit_select(label: str, current: str, key: str) -> str:
+    return st.selectbox(
+        label,
+        options=TIME_UNITS,
+        index=_TIME_UNIT_IDX[current],
+        key=key,
+    )
 
 
 def _to_seconds(value: float, unit: str) -> float:
-    if unit == "minutes":
-        return value * 60.0
-    return value
+    return value * _SECONDS_PER_UNIT.get(unit, 1.0)
+
+
+def _label_unit(basis_value: str) -> str:
+    """What one "unit" of effective time means for a timing basis."""
+    if basis_value == "cell":
+        return "cell"
+    if basis_value == "diode":
+        return "diode"
+    return "cell (normalised from array)"
+
+
+def _render_effective_time(basis_value: str, effective_time_per_unit_s: float) -> None:
+    st.metric(
+        f"Effective time per {_label_unit(basis_value)}",
+        f"{effective_time_per_unit_s:.3f} s",
+        help="Includes yield effect; this is the value stored for use elsewhere.",
+    )
+
+
+_ARRAY_LEVEL_INFO = (
+    "This is an **array-level** step that will be normalised to a time per cell."
+)
+
+
+# Each step's expander reruns on its own when one of its widgets changes, so
+# editing one step doesn't rebuild every other expander. A full rerun (e.g.
+# the Save button) still runs them all and refreshes the whole buffer.
+@st.fragment
+def _render_step(position, step, operator_profiles_dict, operator_ids, operator_label):
+    """
+    One process step's expander.
+
+    The rebuilt step and its summary row go into the session-state buffer
+    under the step's position rather than being returned, so the function
+    can run as a fragment (whose return value Streamlit discards).
+    """
+    step_id = step.get("id", "unknown")
+    step_name = step.get("name", step_id)
+
+    # Ensure default fields exist for new schema
+    level_value = str(step.get("level", "array")).lower()
+    if level_value not in _LEVEL_IDX:
+        level_value = "array"
+
+    basis_value = str(step.get("timing_basis", "array")).lower()
+    if basis_value not in _TIMING_BASIS_IDX:
+        basis_value = "array"
+
+    entry_mode = step.get("timing_entry_mode", "per_unit")
+    if entry_mode not in _ENTRY_MODE_IDX:
+        entry_mode = "per_unit"
+
+    time_value = float(step.get("time_value", 0.0))
+    time_unit = step.get("time_unit", "seconds")
+    if time_unit not in _TIME_UNIT_IDX:
+        time_unit = "seconds"
+
+    # Only the active basis/entry mode needs these as floats; the others
+    # are carried through (and coerced) when the step is rebuilt below
+    batch_units = step.get("batch_units", 1.0)
+    batch_time_value = step.get("batch_time_value", 0.0)
+    batch_time_unit = step.get("batch_time_unit", "seconds")
+    if batch_time_unit not in _TIME_UNIT_IDX:
+        batch_time_unit = "seconds"
+
+    cells_per_array_for_step = step.get("cells_per_array_for_step", 1.0)
+
+    yield_fraction = float(step.get("yield_fraction", 1.0))
+    if yield_fraction <= 0:
+        yield_fraction = 1.0
+
+    operators_raw = step.get("operators", [])
+    if isinstance(operators_raw, int):
+        # old schema: just a count
+        operators_raw = [{"operator_id": None} for _ in range(operators_raw)]
+
+    with st.expander(f"{step_name}  (`{step_id}`)", expanded=False):
+
+        # The step's widgets are only created once it has been opened for
+        # editing; until then it is saved back exactly as loaded.
+        open_key = f"_open_{step_id}"
+        if not st.session_state.get(open_key, False):
+            stored_time_s = float(step.get("time_per_unit_s", 0.0))
+            if basis_value == "array":
+                st.markdown(_ARRAY_LEVEL_INFO)
+            _render_effective_time(basis_value, stored_time_s)
+            if not st.button("Edit", key=f"edit_{step_id}"):
+                st.session_state[_STEP_BUF_KEY][position] = (
+                    step,
+                    (step_name, basis_value, level_value, stored_time_s),
+                )
+                return
+            st.session_state[open_key] = True
+
+        # ---- Top row: name, level, basis ----
+        cols_top = st.columns([2, 1, 1])
+        with cols_top[0]:
+            name = st.text_input(
+                "Step name",
+                value=step_name,
+                key=f"name_{step_id}",
+            )
+        with cols_top[1]:
+            level_value = st.selectbox(
+                "Level (for organisation)",
+                options=LEVEL_OPTIONS,
+                index=_LEVEL_IDX[level_value],
+                key=f"level_{step_id}",
+                format_func=lambda x: x.capitalize(),
+            )
+        with cols_top[2]:
+            basis_value = st.selectbox(
+                "Timing basis",
+                options=TIMING_BASIS_OPTIONS,
+                index=_TIMING_BASIS_IDX[basis_value],
+                key=f"basis_{step_id}",
+                format_func=lambda x: TIMING_BASIS_LABELS.get(x, x),
+            )
+
+        # ---- Timing inputs based on basis ----
+        raw_time_per_unit_s = 0.0
+
+        if basis_value in ("cell", "diode"):
+            # Choose entry mode
+            entry_mode = st.selectbox(
+                "Timing entry mode",
+                options=ENTRY_MODES,
+                index=_ENTRY_MODE_IDX[entry_mode],
+                key=f"entry_{step_id}",
+                format_func=lambda x: ENTRY_MODE_LABELS.get(x, x),
+            )
+
+            if entry_mode == "per_unit":
+                # Time per cell / per diode
+                col_t = st.columns(2)
+                with col_t[0]:
+                    time_value = st.number_input(
+                        f"Time per {basis_value}",
+                        min_value=0.0,
+                        value=time_value,
+                        step=0.1,
+                        key=f"time_val_{step_id}",
+                    )
+                with col_t[1]:
+                    time_unit = _time_unit_select(
+                        "Time unit", time_unit, f"time_unit_{step_id}"
+                    )
+                raw_time_per_unit_s = _to_seconds(time_value, time_unit)
+
+            else:  # per_batch
+                batch_units = float(batch_units)
+                batch_time_value = float(batch_time_value)
+                cols_batch = st.columns(3)
+                label_units = "cells per batch" if basis_value == "cell" else "diodes per batch"
+                with cols_batch[0]:
+                    batch_units = st.number_input(
+                        label_units,
+                        min_value=1.0,
+                        value=batch_units if batch_units > 0 else 1.0,
+                        step=1.0,
+                        key=f"batch_units_{step_id}",
+                    )
+                with cols_batch[1]:
+                    batch_time_value = st.number_input(
+                        "Time per batch",
+                        min_value=0.0,
+                        value=batch_time_value,
+                        step=0.1,
+                        key=f"batch_time_val_{step_id}",
+                    )
+                with cols_batch[2]:
+                    batch_time_unit = _time_unit_select(
+                        "Batch time unit",
+                        batch_time_unit,
+                        f"batch_time_unit_{step_id}",
+                    )
+
+                if batch_units > 0:
+                    raw_time_per_unit_s = _to_seconds(batch_time_value, batch_time_unit) / batch_units
+                else:
+                    raw_time_per_unit_s = 0.0
+
+        elif basis_value == "array":
+            st.markdown(_ARRAY_LEVEL_INFO)
+            cells_per_array_for_step = float(cells_per_array_for_step)
+            cols_arr = st.columns(3)
+            with cols_arr[0]:
+                cells_per_array_for_step = st.number_input(
+                    "Cells per array (for this step)",
+                    min_value=1.0,
+                    value=cells_per_array_for_step if cells_per_array_for_step > 0 else 1.0,
+                    step=1.0,
+                    key=f"cells_array_step_{step_id}",
+                )
+            with cols_arr[1]:
+                time_value = st.number_input(
+                    "Time per array",
+                    min_value=0.0,
+                    value=time_value,
+                    step=0.1,
+                    key=f"time_arr_{step_id}",
+                )
+            with cols_arr[2]:
+                time_unit = _time_unit_select(
+                    "Array time unit", time_unit, f"time_unit_arr_{step_id}"
+                )
+
+            if cells_per_array_for_step > 0:
+                raw_time_per_unit_s = _to_seconds(time_value, time_unit) / cells_per_array_for_step
+            else:
+                raw_time_per_unit_s = 0.0
+
+        # ---- Yield & operators & notes ----
+        cols_mid = st.columns(3)
+        with cols_mid[0]:
+            yield_percent = st.number_input(
+                "Yield (%)",
+                min_value=1.0,
+                max_value=100.0,
+                value=round(yield_fraction * 100.0, 1),
+                step=1.0,
+                key=f"yield_{step_id}",
+            )
+            yield_fraction = yield_percent / 100.0
+            if yield_fraction <= 0:
+                yield_fraction = 1.0
+
+        with cols_mid[1]:
+            existing_ops_ids = [
+                oid
+                for oid in (op.get("operator_id") for op in operators_raw)
+                if oid in operator_profiles_dict
+            ]
+            selected_ops = st.multiselect(
+                "Assigned operators",
+                options=operator_ids,
+                default=existing_ops_ids,
+                format_func=operator_label,
+                key=f"ops_{step_id}",
+            )
+
+        with cols_mid[2]:
+            notes = st.text_area(
+                "Notes",
+                value=step.get("notes", ""),
+                key=f"notes_{step_id}",
+                height=80,
+            )
+
+        # ---- Effective time per unit (after yield) ----
+        effective_time_per_unit_s = raw_time_per_unit_s / yield_fraction if yield_fraction > 0 else 0.0
+
+        _render_effective_time(basis_value, effective_time_per_unit_s)
+
+        # ---- Build updated step dict ----
+        # The form's fields are laid over the loaded step, so keys it doesn't
+        # edit (machine_time_share, batch_size, ...) are saved back unchanged.
+        new_step = {
+            **step,
+            "name": name,
+            "level": level_value,
+            "timing_basis": basis_value,
+            "time_per_unit_s": float(effective_time_per_unit_s),
+            "operators": [{"operator_id": oid} for oid in selected_ops],
+            "notes": notes,
+            "yield_fraction": float(yield_fraction),
+            "batch_units": float(batch_units),
+            "timing_entry_mode": entry_mode,
+            "time_value": float(time_value),
+            "time_unit": time_unit,
+            "batch_time_value": float(batch_time_value),
+            "batch_time_unit": batch_time_unit,
+            "cells_per_array_for_step": float(cells_per_array_for_step),
+        }
+
+        st.session_state[_STEP_BUF_KEY][position] = (
+            new_step,
+            (name, basis_value, level_value, effective_time_per_unit_s),
+        )
 
 
 def render():
@@ -62,47 +408,33 @@ All times are converted internally to an **effective seconds per cell** or **sec
     # -------------------------------------------------------
     # LOAD DATA
     # -------------------------------------------------------
-    operator_profiles_dict = load_operator_profiles()
-    process_steps = load_process_steps()
+    # Cached on the files' mtimes: a save below changes the mtime, so the
+    # rerun it triggers picks up the new data without an explicit clear.
+    operator_profiles_dict = cached_operator_profiles()
+    process_steps = cached_process_steps()
 
-    operator_labels = {
-        op.id: f"{op.name} (£{op.hourly_rate:.2f}/hr)"
-        for op in operator_profiles_dict.values()
-    }
+    operator_labels = _operator_labels(file_mtime_ns(OPERATOR_PROFILES_PATH))
 
     # -------------------------------------------------------
     # OPERATOR PROFILES EDITOR
     # -------------------------------------------------------
     with st.expander("Operator Profiles (edit & save)", expanded=False):
 
-        existing_ops = [
-            {
-                "id": op.id,
-                "name": op.name,
-                "job_title": op.job_title,
-                "hourly_rate": op.hourly_rate,
-            }
-            for op in operator_profiles_dict.values()
-        ]
-
         op_df = st.data_editor(
-            pd.DataFrame(existing_ops),
+            _operator_frame(operator_profiles_dict.values()),
             num_rows="dynamic",
             use_container_width=True,
+            column_config={
+                "hourly_rate": st.column_config.NumberColumn(format="£%.2f"),
+            },
         )
 
         if st.button("Save Operator Profiles"):
-            new_list = op_df.to_dict(orient="records")
+            new_list = _operator_records(op_df)
             save_operator_profiles(new_list)
             st.success("Saved operator_profiles.yaml ✅")
-            _safe_rerun()
-
-    # Reload after potential update
-    operator_profiles_dict = load_operator_profiles()
-    operator_labels = {
-        op.id: f"{op.name} (£{op.hourly_rate:.2f}/hr)"
-        for op in operator_profiles_dict.values()
-    }
+            # The rerun reloads the profiles (and labels) at the top of render
+            st.rerun()
 
     # -------------------------------------------------------
     # PROCESS STEPS – PER-STEP EXPANDERS
@@ -115,255 +447,24 @@ All times are converted internally to an **effective seconds per cell** or **sec
             "You can define them directly in the YAML file, then refresh."
         )
 
-    updated_steps = []
-    summary_rows = []
-
-    for step in process_steps:
-        step_id = step.get("id", "unknown")
-        step_name = step.get("name", step_id)
-
-        # Ensure default fields exist for new schema
-        level_value = str(step.get("level", "array")).lower()
-        if level_value not in LEVEL_OPTIONS:
-            level_value = "array"
-
-        basis_value = str(step.get("timing_basis", "array")).lower()
-        if basis_value not in TIMING_BASIS_OPTIONS:
-            basis_value = "array"
-
-        entry_mode = step.get("timing_entry_mode", "per_unit")
-        if entry_mode not in ENTRY_MODES:
-            entry_mode = "per_unit"
-
-        time_value = float(step.get("time_value", 0.0))
-        time_unit = step.get("time_unit", "seconds")
-        if time_unit not in TIME_UNITS:
-            time_unit = "seconds"
-
-        batch_units = float(step.get("batch_units", 1.0))
-        batch_time_value = float(step.get("batch_time_value", 0.0))
-        batch_time_unit = step.get("batch_time_unit", "seconds")
-        if batch_time_unit not in TIME_UNITS:
-            batch_time_unit = "seconds"
-
-        cells_per_array_for_step = float(step.get("cells_per_array_for_step", 1.0))
-
-        yield_fraction = float(step.get("yield_fraction", 1.0))
-        if yield_fraction <= 0:
-            yield_fraction = 1.0
-
-        operators_raw = step.get("operators", [])
-        if isinstance(operators_raw, int):
-            # old schema: just a count
-            operators_raw = [{"operator_id": None} for _ in range(operators_raw)]
-
-        with st.expander(f"{step_name}  (`{step_id}`)", expanded=False):
-
-            # ---- Top row: name, level, basis ----
-            cols_top = st.columns([2, 1, 1])
-            with cols_top[0]:
-                name = st.text_input(
-                    "Step name",
-                    value=step_name,
-                    key=f"name_{step_id}",
-                )
-            with cols_top[1]:
-                level_value = st.selectbox(
-                    "Level (for organisation)",
-                    options=LEVEL_OPTIONS,
-                    index=LEVEL_OPTIONS.index(level_value),
-                    key=f"level_{step_id}",
-                    format_func=lambda x: x.capitalize(),
-                )
-            with cols_top[2]:
-                basis_value = st.selectbox(
-                    "Timing basis",
-                    options=TIMING_BASIS_OPTIONS,
-                    index=TIMING_BASIS_OPTIONS.index(basis_value),
-                    key=f"basis_{step_id}",
-                    format_func=lambda x: TIMING_BASIS_LABELS.get(x, x),
-                )
-
-            # ---- Timing inputs based on basis ----
-            raw_time_per_unit_s = 0.0
-
-            if basis_value in ("cell", "diode"):
-                # Choose entry mode
-                entry_mode = st.selectbox(
-                    "Timing entry mode",
-                    options=ENTRY_MODES,
-                    index=ENTRY_MODES.index(entry_mode),
-                    key=f"entry_{step_id}",
-                    format_func=lambda x: ENTRY_MODE_LABELS.get(x, x),
-                )
-
-                if entry_mode == "per_unit":
-                    # Time per cell / per diode
-                    col_t = st.columns(2)
-                    with col_t[0]:
-                        time_value = st.number_input(
-                            f"Time per {basis_value}",
-                            min_value=0.0,
-                            value=time_value,
-                            step=0.1,
-                            key=f"time_val_{step_id}",
-                        )
-                    with col_t[1]:
-                        time_unit = st.selectbox(
-                            "Time unit",
-                            options=TIME_UNITS,
-                            index=TIME_UNITS.index(time_unit),
-                            key=f"time_unit_{step_id}",
-                        )
-                    raw_time_per_unit_s = _to_seconds(time_value, time_unit)
-
-                else:  # per_batch
-                    cols_batch = st.columns(3)
-                    label_units = "cells per batch" if basis_value == "cell" else "diodes per batch"
-                    with cols_batch[0]:
-                        batch_units = st.number_input(
-                            label_units,
-                            min_value=1.0,
-                            value=batch_units if batch_units > 0 else 1.0,
-                            step=1.0,
-                            key=f"batch_units_{step_id}",
-                        )
-                    with cols_batch[1]:
-                        batch_time_value = st.number_input(
-                            "Time per batch",
-                            min_value=0.0,
-                            value=batch_time_value,
-                            step=0.1,
-                            key=f"batch_time_val_{step_id}",
-                        )
-                    with cols_batch[2]:
-                        batch_time_unit = st.selectbox(
-                            "Batch time unit",
-                            options=TIME_UNITS,
-                            index=TIME_UNITS.index(batch_time_unit),
-                            key=f"batch_time_unit_{step_id}",
-                        )
-
-                    if batch_units > 0:
-                        raw_time_per_unit_s = _to_seconds(batch_time_value, batch_time_unit) / batch_units
-                    else:
-                        raw_time_per_unit_s = 0.0
-
-            elif basis_value == "array":
-                st.markdown(
-                    "This is an **array-level** step that will be normalised to a time per cell."
-                )
-                cols_arr = st.columns(3)
-                with cols_arr[0]:
-                    cells_per_array_for_step = st.number_input(
-                        "Cells per array (for this step)",
-                        min_value=1.0,
-                        value=cells_per_array_for_step if cells_per_array_for_step > 0 else 1.0,
-                        step=1.0,
-                        key=f"cells_array_step_{step_id}",
-                    )
-                with cols_arr[1]:
-                    time_value = st.number_input(
-                        "Time per array",
-                        min_value=0.0,
-                        value=time_value,
-                        step=0.1,
-                        key=f"time_arr_{step_id}",
-                    )
-                with cols_arr[2]:
-                    time_unit = st.selectbox(
-                        "Array time unit",
-                        options=TIME_UNITS,
-                        index=TIME_UNITS.index(time_unit),
-                        key=f"time_unit_arr_{step_id}",
-                    )
-
-                if cells_per_array_for_step > 0:
-                    raw_time_per_unit_s = _to_seconds(time_value, time_unit) / cells_per_array_for_step
-                else:
-                    raw_time_per_unit_s = 0.0
-
-            # ---- Yield & operators & notes ----
-            cols_mid = st.columns(3)
-            with cols_mid[0]:
-                yield_percent = st.number_input(
-                    "Yield (%)",
-                    min_value=1.0,
-                    max_value=100.0,
-                    value=round(yield_fraction * 100.0, 1),
-                    step=1.0,
-                    key=f"yield_{step_id}",
-                )
-                yield_fraction = yield_percent / 100.0
-                if yield_fraction <= 0:
-                    yield_fraction = 1.0
-
-            with cols_mid[1]:
-                existing_ops_ids = [
-                    op.get("operator_id")
-                    for op in operators_raw
-                    if op.get("operator_id") in operator_profiles_dict
-                ]
-                selected_ops = st.multiselect(
-                    "Assigned operators",
-                    options=list(operator_labels.keys()),
-                    default=existing_ops_ids,
-                    format_func=lambda oid: operator_labels.get(oid, oid),
-                    key=f"ops_{step_id}",
-                )
-
-            with cols_mid[2]:
-                notes = st.text_area(
-                    "Notes",
-                    value=step.get("notes", ""),
-                    key=f"notes_{step_id}",
-                    height=80,
-                )
+    # Shared by every step's operator multiselect
+    operator_ids = list(operator_labels)
 
-            # ---- Effective time per unit (after yield) ----
-            effective_time_per_unit_s = raw_time_per_unit_s / yield_fraction if yield_fraction > 0 else 0.0
+    def operator_label(oid):
+        return operator_labels.get(oid, oid)
 
-            if basis_value == "cell":
-                label_unit = "cell"
-            elif basis_value == "diode":
-                label_unit = "diode"
-            else:
-                label_unit = "cell (normalised from array)"
-
-            st.metric(
-                f"Effective time per {label_unit}",
-                f"{effective_time_per_unit_s:.3f} s",
-                help="Includes yield effect; this is the value stored for use elsewhere.",
-            )
+    st.session_state[_STEP_BUF_KEY] = {}
+    for position, step in enumerate(process_steps):
+        _render_step(
+            position, step, operator_profiles_dict, operator_ids, operator_label
+        )
 
-            # ---- Build updated step dict ----
-            new_step = step.copy()
-            new_step["name"] = name
-            new_step["level"] = level_value
-            new_step["timing_basis"] = basis_value
-            new_step["timing_entry_mode"] = entry_mode
-            new_step["time_value"] = float(time_value)
-            new_step["time_unit"] = time_unit
-            new_step["batch_units"] = float(batch_units)
-            new_step["batch_time_value"] = float(batch_time_value)
-            new_step["batch_time_unit"] = batch_time_unit
-            new_step["cells_per_array_for_step"] = float(cells_per_array_for_step)
-            new_step["yield_fraction"] = float(yield_fraction)
-            new_step["time_per_unit_s"] = float(effective_time_per_unit_s)
-            new_step["notes"] = notes
-            new_step["operators"] = [{"operator_id": oid} for oid in selected_ops]
-
-            updated_steps.append(new_step)
-
-            # For summary table
-            summary_rows.append(
-                {
-                    "Step": name,
-                    "Basis": basis_value,
-                    "Level": level_value,
-                    "Effective time per unit (s)": effective_time_per_unit_s,
-                }
-            )
+    buffered = [st.session_state[_STEP_BUF_KEY][i] for i in range(len(process_steps))]
+    updated_steps = [new_step for new_step, _ in buffered]
+    summary_steps = [row[0] for _, row in buffered]
+    summary_bases = [row[1] for _, row in buffered]
+    summary_levels = [row[2] for _, row in buffered]
+    summary_times = [row[3] for _, row in buffered]
 
     # -------------------------------------------------------
     # SAVE + SUMMARY
@@ -374,10 +475,24 @@ All times are converted internally to an **effective seconds per cell** or **sec
     if st.button("Save process timings"):
         save_process_steps(updated_steps)
         st.success("Process timings saved to process.yaml ✅")
-        _safe_rerun()
+        st.rerun()
 
-    if summary_rows:
+    if summary_steps:
         st.markdown("### Effective standard times")
-        st.dataframe(pd.DataFrame(summary_rows), use_container_width=True)
+        summary_df = pd.DataFrame(
+            {
+                "Step": summary_steps,
+                "Basis": summary_bases,
+                "Level": summary_levels,
+                "Effective time per unit (s)": summary_times,
+            }
+        )
+        if len(summary_df) < _HTML_SUMMARY_MAX_ROWS:
+            st.markdown(
+                summary_df.to_html(index=False, float_format="{:.3f}".format),
+                unsafe_allow_html=True,
+            )
+        else:
+            st.dataframe(summary_df, use_container_width=True)
     else:
         st.caption("No steps to summarise yet.")
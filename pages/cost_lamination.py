@@ -1,6 +1,7 @@
+import numpy as np
 import streamlit as st
 
-from model import load_array_designs, load_materials, load_product
+from cached_loaders import cached_array_designs, cached_materials, cached_product
 from pages.array_designs import compute_power_for_design
 
 
@@ -8,6 +9,10 @@ from pages.array_designs import compute_power_for_design
 # Helper Functions
 # ============================================================
 
+# Metres per roll length unit; anything unrecognised is taken as metres
+_METRES_PER_LENGTH_UNIT = {"ft": 0.3048, "foot": 0.3048, "feet": 0.3048}
+
+
 def get_lamination_cost_per_m(item: dict, exchange_rate_gbp_per_usd: float) -> float:
     """
     Compute lamination cost per meter (GBP).
@@ -29,10 +34,7 @@ def get_lamination_cost_per_m(item: dict, exchange_rate_gbp_per_usd: float) -> f
         return 0.0
 
     # Convert ft → m
-    if length_unit in ("ft", "foot", "feet"):
-        roll_length_m = length_value * 0.3048
-    else:
-        roll_length_m = length_value
+    roll_length_m = length_value * _METRES_PER_LENGTH_UNIT.get(length_unit, 1.0)
 
     roll_cost_gbp = item.get("roll_cost_gbp", None)
     roll_cost_usd = item.get("roll_cost_usd", None)
@@ -74,17 +76,17 @@ def render():
     # ---------------------------------------------------------
     # Load product, designs, materials
     # ---------------------------------------------------------
-    product = load_product()
+    product = cached_product()
     exchange_rate = product.exchange_rate_gbp_per_usd
 
-    designs = load_array_designs()
+    designs = cached_array_designs()
     design = next((d for d in designs if d["name"] == selected_name), None)
 
     if design is None:
         st.error("Selected array design not found.")
         return
 
-    materials = load_materials()
+    materials = cached_materials()
     lam_items = materials.get("Lamination", [])
 
     if not lam_items:
@@ -123,7 +125,7 @@ def render():
     base_length_m = base_length_mm / 1000.0
 
     st.subheader("Base Lamination Length")
-    st.write(
+    st.markdown(
         f"""
         Calculated from array design:
 
@@ -144,45 +146,54 @@ def render():
     if "cost_lamination_state" not in st.session_state:
         # Defaults: first 3 materials for layers, first material for liner, 0 waste
         st.session_state["cost_lamination_state"] = {
-            "layer_indices": [0, 0, 0],
-            "layer_waste_mm": [0.0, 0.0, 0.0],
+            "layer_indices": np.zeros(3, dtype=np.int64),
+            "layer_waste_mm": np.zeros(3, dtype=np.float64),
             "liner_index": 0,
         }
 
     state = st.session_state["cost_lamination_state"]
+    # Home / Summary may have created the state with plain lists
+    state["layer_indices"] = np.asarray(state["layer_indices"], dtype=np.int64)
+    state["layer_waste_mm"] = np.asarray(state["layer_waste_mm"], dtype=np.float64)
+
+    # Cost per metre by item index, filled on first use: the layers and the
+    # liner often share a material, so each one is priced once per render
+    costs_per_m: dict[int, float] = {}
+
+    def cost_per_m_for(idx: int) -> float:
+        if idx not in costs_per_m:
+            costs_per_m[idx] = get_lamination_cost_per_m(lam_items[idx], exchange_rate)
+        return costs_per_m[idx]
 
-    # Label list for selects
-    lam_labels = [
-        f"{i}: {it.get('id','(no id)')} – {it.get('name','(no name)')}"
-        for i, it in enumerate(lam_items)
-    ]
+    # Selects return the item index; labels are formatted only for display
+    lam_indices = range(len(lam_items))
+
+    def lam_label(i: int) -> str:
+        it = lam_items[i]
+        return f"{i}: {it.get('id','(no id)')} – {it.get('name','(no name)')}"
 
     # ============================================================
     # Lamination Stack – 3 layers
     # ============================================================
     st.subheader("Lamination Stack (3 Layers)")
 
-    total_stack_cost = 0.0
-    total_stack_length_m = 0.0
-
     for layer_idx in range(3):
         st.markdown(f"### Layer {layer_idx + 1}")
 
         # Ensure index is in range
-        current_index = state["layer_indices"][layer_idx]
-        if current_index >= len(lam_labels):
+        current_index = int(state["layer_indices"][layer_idx])
+        if current_index >= len(lam_items):
             current_index = 0
             state["layer_indices"][layer_idx] = 0
 
-        sel = st.selectbox(
+        sel_idx = st.selectbox(
             f"Material for Layer {layer_idx + 1}",
-            lam_labels,
+            lam_indices,
             index=current_index,
+            format_func=lam_label,
             key=f"cost_lamination_layer_{layer_idx}_material",
         )
-        sel_idx = int(sel.split(":", 1)[0])
         state["layer_indices"][layer_idx] = sel_idx
-        layer_item = lam_items[sel_idx]
 
         col_len = st.columns(3)
         with col_len[0]:
@@ -207,7 +218,7 @@ def render():
             waste_pct = (waste_mm / total_length_mm * 100.0) if total_length_mm > 0 else 0.0
             st.write(f"Waste: **{waste_pct:.2f}%**")
 
-        cost_per_m = get_lamination_cost_per_m(layer_item, exchange_rate)
+        cost_per_m = cost_per_m_for(sel_idx)
         cost_layer = cost_per_m * total_length_m
 
         st.write(
@@ -216,11 +227,14 @@ def render():
             f"Layer cost: **£{cost_layer:.2f}**"
         )
 
-        total_stack_cost += cost_layer
-        total_stack_length_m += total_length_m
-
         st.markdown("---")
 
+    # Stack totals over all layers at once
+    layer_lengths_m = (base_length_mm + state["layer_waste_mm"]) / 1000.0
+    layer_costs_per_m = np.array([cost_per_m_for(i) for i in state["layer_indices"]])
+    total_stack_cost = float((layer_lengths_m * layer_costs_per_m).sum())
+    total_stack_length_m = float(layer_lengths_m.sum())
+
     # ============================================================
     # Welding Liner
     # ============================================================
@@ -228,22 +242,21 @@ def render():
 
     # Ensure liner index in range
     liner_index = state["liner_index"]
-    if liner_index >= len(lam_labels):
+    if liner_index >= len(lam_items):
         liner_index = 0
         state["liner_index"] = 0
 
-    liner_sel = st.selectbox(
+    liner_idx = st.selectbox(
         "Select welding liner material",
-        lam_labels,
+        lam_indices,
         index=liner_index,
+        format_func=lam_label,
         key="cost_lamination_liner_material",
     )
-    liner_idx = int(liner_sel.split(":", 1)[0])
     state["liner_index"] = liner_idx
-    liner_item = lam_items[liner_idx]
 
     liner_length_m = base_length_m
-    liner_cost_per_m = get_lamination_cost_per_m(liner_item, exchange_rate)
+    liner_cost_per_m = cost_per_m_for(liner_idx)
     liner_cost = liner_cost_per_m * liner_length_m
 
     st.write(
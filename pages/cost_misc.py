@@ -1,7 +1,11 @@
+from functools import lru_cache
+from typing import Optional, Tuple
+
 import streamlit as st
 
-from model import load_array_designs, load_materials, load_product
-from pages.array_designs import compute_power_for_design
+from cached_loaders import cached_materials_index, file_mtime_ns
+from model import MATERIALS_FILE
+from pages.array_designs import selected_design_context
 
 
 # ============================================================
@@ -89,6 +93,138 @@ def get_epoxy_cost_per_ml(item: dict, exchange_rate_gbp_per_usd: float) -> float
     return 0.0
 
 
+def find_kapton_item(misc: dict) -> Optional[dict]:
+    """Kapton insulation in an indexed Misc category: by id, else by type."""
+    item = misc["by_id"].get("Kapton_Insulation")
+    if item is None:
+        kaptons = misc["by_type"].get("kapton")
+        item = kaptons[0] if kaptons else None
+    return item
+
+
+@lru_cache(maxsize=8)
+def _misc_unit_costs(
+    materials_mtime_ns: int,
+    exchange_rate_gbp_per_usd: float,
+) -> Tuple[float, Tuple[float, ...]]:
+    """
+    (Kapton GBP per disk, GBP per mL of each epoxy item in file order).
+
+    Keyed on the materials file version and exchange rate, so the helpers
+    above run once per edit instead of on every rerun.
+    """
+    misc = cached_materials_index()["Misc"]
+    kapton_item = find_kapton_item(misc)
+    kapton_cost = (
+        0.0
+        if kapton_item is None
+        else get_kapton_cost_per_disk(kapton_item, exchange_rate_gbp_per_usd)
+    )
+    epoxy_costs = tuple(
+        get_epoxy_cost_per_ml(item, exchange_rate_gbp_per_usd)
+        for item in misc["by_type"].get("epoxy", [])
+    )
+    return kapton_cost, epoxy_costs
+
+
+@lru_cache(maxsize=4)
+def _epoxy_labels(materials_mtime_ns: int) -> Tuple[str, ...]:
+    """Select labels of the epoxy items, built once per materials version."""
+    epoxy_items = cached_materials_index()["Misc"]["by_type"].get("epoxy", [])
+    return tuple(
+        f"{i}: {it.get('id','(no id)')} – {it.get('name','(no name)')}"
+        for i, it in enumerate(epoxy_items)
+    )
+
+
+@st.fragment
+def _render_epoxy_and_totals(
+    epoxy_items,
+    epoxy_labels,
+    epoxy_costs_per_ml,
+    state,
+    kapton_cost_total,
+    array_power,
+    illumination,
+):
+    """
+    Epoxy inputs and the misc totals, which are the only part of the page
+    that depends on them. Run as a fragment, so editing the epoxy amount
+    doesn't reload the data or redraw the Kapton section.
+    """
+    # ------------------------------------------------------------------
+    # EPOXY
+    # ------------------------------------------------------------------
+    st.subheader("Epoxy")
+
+    if not epoxy_items:
+        st.error("No epoxy items found in Misc (type 'Epoxy').")
+        epoxy_total_cost = 0.0
+    else:
+        # Ensure index is in range
+        current_epoxy_idx = min(state["epoxy_index"], len(epoxy_items) - 1)
+
+        # The select returns the item index; labels are looked up for display
+        epoxy_idx = st.selectbox(
+            "Select epoxy type",
+            range(len(epoxy_items)),
+            index=current_epoxy_idx,
+            format_func=epoxy_labels.__getitem__,
+            key="cost_misc_epoxy_select",
+        )
+        state["epoxy_index"] = epoxy_idx
+        epoxy_item = epoxy_items[epoxy_idx]
+
+        st.write("Enter the amount of epoxy used **per diode** (mL).")
+
+        amount_per_diode_ml = st.number_input(
+            "Epoxy usage per diode (mL)",
+            min_value=0.0,
+            step=0.01,
+            key="cost_misc_epoxy_per_diode",
+            value=float(state["epoxy_per_diode_ml"]),
+        )
+        state["epoxy_per_diode_ml"] = amount_per_diode_ml
+
+        num_diodes_for_epoxy = 2  # as per your description
+        total_epoxy_ml = amount_per_diode_ml * num_diodes_for_epoxy
+
+        cost_per_ml = epoxy_costs_per_ml[epoxy_idx]
+        epoxy_total_cost = cost_per_ml * total_epoxy_ml
+
+        # One markdown element per section; the blank line ends the list
+        st.markdown(
+            f"- Epoxy selected: **{epoxy_item.get('name','(no name)')}** "
+            f"(id: {epoxy_item.get('id','')})\n"
+            f"- Amount per diode: **{amount_per_diode_ml:.2f} mL**\n"
+            f"- Number of diodes (for epoxy): **{num_diodes_for_epoxy}**\n"
+            f"- Total epoxy used: **{total_epoxy_ml:.2f} mL**\n"
+            f"- Cost per mL: **£{cost_per_ml:.2f}**\n\n"
+            f"→ **Epoxy cost:** £{epoxy_total_cost:.2f}"
+        )
+
+    st.markdown("---")
+
+    # ------------------------------------------------------------------
+    # TOTAL MISC COST
+    # ------------------------------------------------------------------
+    st.subheader("Total Misc Cost")
+
+    total_misc_cost = kapton_cost_total + epoxy_total_cost
+
+    totals = [
+        f"**Kapton cost:** £{kapton_cost_total:.2f}",
+        f"**Epoxy cost:** £{epoxy_total_cost:.2f}",
+        f"**Total Misc cost:** £{total_misc_cost:.2f}",
+    ]
+    if array_power > 0:
+        totals.append(
+            f"**Cost per watt ({illumination}):** "
+            f"£{(total_misc_cost / array_power):.2f} / W"
+        )
+    st.markdown("\n\n".join(totals))
+
+
 # ============================================================
 # Main render
 # ============================================================
@@ -107,29 +243,25 @@ def render():
     illumination = st.session_state.get("selected_illumination", "AM1.5")
 
     # Load core data
-    product = load_product()
-    exchange_rate = product.exchange_rate_gbp_per_usd
-
-    designs = load_array_designs()
-    design = next((d for d in designs if d["name"] == selected_name), None)
+    ctx = selected_design_context(selected_name, illumination)
 
-    if design is None:
+    if ctx is None:
         st.error("Selected array design not found.")
         return
 
-    materials = load_materials()
-    misc_items = materials.get("Misc", [])
+    design = ctx["design"]
+    exchange_rate = ctx["exchange_rate"]
+    array_power = ctx["array_power"]
+
+    misc = cached_materials_index()["Misc"]
+    misc_items = misc["items"]
 
     if not misc_items:
         st.error("No Misc materials found. Add Kapton and Epoxy in Materials → Misc.")
         return
 
-    # Power
-    power = compute_power_for_design(design)
-    array_power = (
-        power["P_array_AM15_W"]
-        if illumination == "AM1.5"
-        else power["P_array_AM0_W"]
+    kapton_cost_per_disk, epoxy_costs_per_ml = _misc_unit_costs(
+        file_mtime_ns(MATERIALS_FILE), exchange_rate
     )
 
     num_cells = int(design.get("num_cells", 0))
@@ -140,24 +272,17 @@ def render():
     # ------------------------------------------------------------------
     # Initialise persistent state (only once)
     # ------------------------------------------------------------------
-    if "cost_misc_state" not in st.session_state:
-        st.session_state["cost_misc_state"] = {
-            "epoxy_index": 0,
-            "epoxy_per_diode_ml": 0.0,
-        }
-
-    state = st.session_state["cost_misc_state"]
+    state = st.session_state.setdefault(
+        "cost_misc_state",
+        {"epoxy_index": 0, "epoxy_per_diode_ml": 0.0},
+    )
 
     # ------------------------------------------------------------------
     # KAPTON INSULATION
     # ------------------------------------------------------------------
     st.subheader("Kapton Insulation Tabs")
 
-    kapton_item = None
-    for it in misc_items:
-        if str(it.get("id", "")) == "Kapton_Insulation" or str(it.get("type", "")).lower() == "kapton":
-            kapton_item = it
-            break
+    kapton_item = find_kapton_item(misc)
 
     if kapton_item is None:
         st.error(
@@ -167,90 +292,26 @@ def render():
         kapton_cost_total = 0.0
     else:
         disks_per_array = num_cells  # one disk per bypass diode
-        cost_per_disk = get_kapton_cost_per_disk(kapton_item, exchange_rate)
+        cost_per_disk = kapton_cost_per_disk
         kapton_cost_total = cost_per_disk * disks_per_array
 
-        st.write(
+        st.markdown(
             f"- Kapton material: **{kapton_item.get('name','(no name)')}** "
-            f"(id: {kapton_item.get('id','')})"
+            f"(id: {kapton_item.get('id','')})\n"
+            f"- Number of disks (same as bypass diodes): **{disks_per_array}**\n"
+            f"- Cost per disk: **£{cost_per_disk:.2f}**\n\n"
+            f"→ **Kapton cost:** £{kapton_cost_total:.2f}"
         )
-        st.write(f"- Number of disks (same as bypass diodes): **{disks_per_array}**")
-        st.write(f"- Cost per disk: **£{cost_per_disk:.2f}**")
-        st.write(f"→ **Kapton cost:** £{kapton_cost_total:.2f}")
 
     st.markdown("---")
 
-    # ------------------------------------------------------------------
-    # EPOXY
-    # ------------------------------------------------------------------
-    st.subheader("Epoxy")
-
-    epoxy_items = [it for it in misc_items if str(it.get("type", "")).lower() == "epoxy"]
-
-    if not epoxy_items:
-        st.error("No epoxy items found in Misc (type 'Epoxy').")
-        epoxy_total_cost = 0.0
-    else:
-        epoxy_labels = [
-            f"{i}: {it.get('id','(no id)')} – {it.get('name','(no name)')}"
-            for i, it in enumerate(epoxy_items)
-        ]
-
-        # Ensure index is in range
-        current_epoxy_idx = min(state["epoxy_index"], len(epoxy_labels) - 1)
-
-        epoxy_sel = st.selectbox(
-            "Select epoxy type",
-            epoxy_labels,
-            index=current_epoxy_idx,
-            key="cost_misc_epoxy_select",
-        )
-        epoxy_idx = int(epoxy_sel.split(":", 1)[0])
-        state["epoxy_index"] = epoxy_idx
-        epoxy_item = epoxy_items[epoxy_idx]
-
-        st.write("Enter the amount of epoxy used **per diode** (mL).")
-
-        amount_per_diode_ml = st.number_input(
-            "Epoxy usage per diode (mL)",
-            min_value=0.0,
-            step=0.01,
-            key="cost_misc_epoxy_per_diode",
-            value=float(state["epoxy_per_diode_ml"]),
-        )
-        state["epoxy_per_diode_ml"] = amount_per_diode_ml
-
-        num_diodes_for_epoxy = 2  # as per your description
-        total_epoxy_ml = amount_per_diode_ml * num_diodes_for_epoxy
-
-        cost_per_ml = get_epoxy_cost_per_ml(epoxy_item, exchange_rate)
-        epoxy_total_cost = cost_per_ml * total_epoxy_ml
-
-        st.write(
-            f"- Epoxy selected: **{epoxy_item.get('name','(no name)')}** "
-            f"(id: {epoxy_item.get('id','')})"
-        )
-        st.write(f"- Amount per diode: **{amount_per_diode_ml:.2f} mL**")
-        st.write(f"- Number of diodes (for epoxy): **{num_diodes_for_epoxy}**")
-        st.write(f"- Total epoxy used: **{total_epoxy_ml:.2f} mL**")
-        st.write(f"- Cost per mL: **£{cost_per_ml:.2f}**")
-        st.write(f"→ **Epoxy cost:** £{epoxy_total_cost:.2f}")
-
-    st.markdown("---")
-
-    # ------------------------------------------------------------------
-    # TOTAL MISC COST
-    # ------------------------------------------------------------------
-    st.subheader("Total Misc Cost")
-
-    total_misc_cost = kapton_cost_total + epoxy_total_cost
-
-    st.write(f"**Kapton cost:** £{kapton_cost_total:.2f}")
-    st.write(f"**Epoxy cost:** £{epoxy_total_cost:.2f}")
-    st.write(f"**Total Misc cost:** £{total_misc_cost:.2f}")
-
-    if array_power > 0:
-        st.write(
-            f"**Cost per watt ({illumination}):** "
-            f"£{(total_misc_cost / array_power):.2f} / W"
-        )
+    epoxy_items = misc["by_type"].get("epoxy", [])
+    _render_epoxy_and_totals(
+        epoxy_items,
+        _epoxy_labels(file_mtime_ns(MATERIALS_FILE)),
+        epoxy_costs_per_ml,
+        state,
+        kapton_cost_total,
+        array_power,
+        illumination,
+    )
@@ -1,7 +1,15 @@
+from functools import lru_cache
+from typing import Dict, Tuple
+
 import streamlit as st
 
-from model import load_array_designs, load_materials, load_product
-from pages.array_designs import compute_power_for_design
+from cached_loaders import (
+    cached_foam_positions_by_thickness,
+    cached_materials_index,
+    file_mtime_ns,
+)
+from model import MATERIALS_FILE
+from pages.array_designs import selected_design_context
 
 
 # ============================================================
@@ -73,6 +81,152 @@ def get_foam_cost_per_piece(item: dict, exchange_rate_gbp_per_usd: float) -> flo
     return 0.0
 
 
+@lru_cache(maxsize=8)
+def _packaging_unit_costs(
+    materials_mtime_ns: int,
+    exchange_rate_gbp_per_usd: float,
+) -> Dict[str, Tuple[float, ...]]:
+    """
+    GBP per unit of each frame, shipping board, box and foam item.
+
+    Keyed by lower-cased type, each tuple in the same order as the index's
+    by_type list; foam is priced per piece. Computed once per materials
+    file version and exchange rate. Treat the returned dict as read-only.
+    """
+    by_type = cached_materials_index()["Packaging"]["by_type"]
+    costs = {
+        kind: tuple(
+            get_unit_cost_gbp(it, exchange_rate_gbp_per_usd)
+            for it in by_type.get(kind, [])
+        )
+        for kind in ("frame", "shipping board", "box")
+    }
+    costs["foam"] = tuple(
+        get_foam_cost_per_piece(it, exchange_rate_gbp_per_usd)
+        for it in by_type.get("foam", [])
+    )
+    return costs
+
+
+@lru_cache(maxsize=4)
+def _packaging_labels(materials_mtime_ns: int) -> Dict[str, Tuple[str, ...]]:
+    """
+    Select labels of the frame, shipping board and box items, keyed like
+    _packaging_unit_costs. Built once per materials file version.
+    """
+    by_type = cached_materials_index()["Packaging"]["by_type"]
+    labels = {
+        kind: tuple(
+            f"{i}: {it.get('id','(no id)')} – {it.get('name','(no name)')}"
+            for i, it in enumerate(by_type.get(kind, []))
+        )
+        for kind in ("frame", "shipping board")
+    }
+    labels["box"] = tuple(
+        f"{i}: {it.get('id','(no id)')} – {it.get('name','(no name)')} "
+        f"({it.get('diameter_mm','?')} mm diameter)"
+        for i, it in enumerate(by_type.get("box", []))
+    )
+    return labels
+
+
+@st.fragment
+def _render_box_and_totals(
+    boxes,
+    box_labels,
+    unit_costs,
+    foam_3mm_pos,
+    foam_25mm_pos,
+    state,
+    frame_cost,
+    board_cost,
+    array_power,
+    illumination,
+):
+    """
+    Box/foam inputs and the packaging totals that depend on them. Run as a
+    fragment, so changing arrays per box doesn't reload the data or redraw
+    the frame and board section.
+    """
+    # ---------------------------------------------------------
+    # Box + Foam (per box)
+    # ---------------------------------------------------------
+    st.subheader("Box and Foam per Box")
+
+    current_box_idx = min(state["box_idx"], len(boxes) - 1)
+    box_idx = st.selectbox(
+        "Select box type",
+        range(len(boxes)),
+        index=current_box_idx,
+        format_func=box_labels.__getitem__,
+        key="cost_packaging_box_select",
+    )
+    state["box_idx"] = box_idx
+    box_item = boxes[box_idx]
+    box_cost = unit_costs["box"][box_idx]
+
+    arrays_per_box = st.number_input(
+        "Number of arrays per box",
+        min_value=1,
+        step=1,
+        key="cost_packaging_arrays_per_box",
+        value=int(state["arrays_per_box"]),
+    )
+    state["arrays_per_box"] = arrays_per_box
+
+    # Foam usage:
+    #  - 25mm foam: 2 pieces per box (top + bottom)
+    #  - 3mm foam: (arrays_per_box - 1) pieces between arrays
+    foam_25_pieces = 2
+    foam_3_pieces = max(arrays_per_box - 1, 0)
+
+    foam_25_cost_per_piece = unit_costs["foam"][foam_25mm_pos]
+    foam_3_cost_per_piece = unit_costs["foam"][foam_3mm_pos]
+
+    foam_25_cost_box = foam_25_cost_per_piece * foam_25_pieces
+    foam_3_cost_box = foam_3_cost_per_piece * foam_3_pieces
+    total_foam_cost_box = foam_25_cost_box + foam_3_cost_box
+
+    # One markdown element per section
+    st.markdown(
+        f"- Box: **{box_item.get('name','(no name)')}** "
+        f"(id: {box_item.get('id','')}, diameter {box_item.get('diameter_mm','?')} mm) "
+        f"– **£{box_cost:.2f}** per box\n"
+        f"- 25mm foam pieces per box: **{foam_25_pieces}** "
+        f"→ cost **£{foam_25_cost_box:.2f}**\n"
+        f"- 3mm foam pieces per box: **{foam_3_pieces}** "
+        f"→ cost **£{foam_3_cost_box:.2f}**\n"
+        f"- Total foam cost per box: **£{total_foam_cost_box:.2f}**"
+    )
+
+    st.markdown("---")
+
+    # ---------------------------------------------------------
+    # Total packaging cost per array
+    # ---------------------------------------------------------
+    st.subheader("Total Packaging Cost per Array")
+
+    frame_board_per_array = frame_cost + board_cost
+    shared_per_box = box_cost + total_foam_cost_box
+    shared_per_array = shared_per_box / arrays_per_box
+
+    total_packaging_per_array = frame_board_per_array + shared_per_array
+
+    totals = [
+        f"- Frame + board per array: **£{frame_board_per_array:.2f}**\n"
+        f"- Box + foam per array (shared): **£{shared_per_array:.2f}** "
+        f"(with {arrays_per_box} arrays per box)",
+        f"**Total packaging cost per array:** **£{total_packaging_per_array:.2f}**",
+    ]
+    if array_power > 0:
+        cost_per_watt = total_packaging_per_array / array_power
+        totals.append(
+            f"**Packaging cost per watt ({illumination}):** "
+            f"£{cost_per_watt:.5f} / W"
+        )
+    st.markdown("\n\n".join(totals))
+
+
 # ============================================================
 # Main render
 # ============================================================
@@ -93,38 +247,29 @@ def render():
     # ---------------------------------------------------------
     # Load core data
     # ---------------------------------------------------------
-    product = load_product()
-    exchange_rate = product.exchange_rate_gbp_per_usd
+    ctx = selected_design_context(selected_name, illumination)
 
-    designs = load_array_designs()
-    design = next((d for d in designs if d["name"] == selected_name), None)
-
-    if design is None:
+    if ctx is None:
         st.error("Selected array design not found.")
         return
 
-    materials = load_materials()
-    packaging_items = materials.get("Packaging", [])
+    exchange_rate = ctx["exchange_rate"]
+    array_power = ctx["array_power"]
+
+    packaging = cached_materials_index()["Packaging"]
+    packaging_items = packaging["items"]
 
     if not packaging_items:
         st.error("No Packaging materials found. Add some under Materials → Packaging.")
         return
 
-    # Power
-    power = compute_power_for_design(design)
-    array_power = (
-        power["P_array_AM15_W"]
-        if illumination == "AM1.5"
-        else power["P_array_AM0_W"]
-    )
-
     # ---------------------------------------------------------
     # Categorise packaging items
     # ---------------------------------------------------------
-    frames = [it for it in packaging_items if str(it.get("type", "")).lower() == "frame"]
-    boards = [it for it in packaging_items if str(it.get("type", "")).lower() == "shipping board"]
-    foams = [it for it in packaging_items if str(it.get("type", "")).lower() == "foam"]
-    boxes = [it for it in packaging_items if str(it.get("type", "")).lower() == "box"]
+    frames = packaging["by_type"].get("frame", [])
+    boards = packaging["by_type"].get("shipping board", [])
+    foams = packaging["by_type"].get("foam", [])
+    boxes = packaging["by_type"].get("box", [])
 
     if not frames:
         st.error("No frames found in Packaging (type 'Frame').")
@@ -139,20 +284,14 @@ def render():
         st.error("No box items found in Packaging (type 'Box').")
         return
 
-    # Separate 3mm and 25mm foam
-    foam_3mm = None
-    foam_25mm = None
-    for f in foams:
-        try:
-            th = float(f.get("thickness_mm", 0.0))
-        except (TypeError, ValueError):
-            th = 0.0
-        if abs(th - 3.0) < 1e-3:
-            foam_3mm = f
-        elif abs(th - 25.0) < 1e-3:
-            foam_25mm = f
+    unit_costs = _packaging_unit_costs(file_mtime_ns(MATERIALS_FILE), exchange_rate)
+
+    # Positions of the 3mm and 25mm foam within foams
+    foam_positions = cached_foam_positions_by_thickness()
+    foam_3mm_pos = foam_positions.get(3.0)
+    foam_25mm_pos = foam_positions.get(25.0)
 
-    if foam_3mm is None or foam_25mm is None:
+    if foam_3mm_pos is None or foam_25mm_pos is None:
         st.error(
             "Expected both 3mm and 25mm foam in Packaging (type 'Foam' with thickness_mm 3.0 and 25.0)."
         )
@@ -161,146 +300,61 @@ def render():
     # ---------------------------------------------------------
     # Initialise persistent state
     # ---------------------------------------------------------
-    if "cost_packaging_state" not in st.session_state:
-        st.session_state["cost_packaging_state"] = {
-            "frame_idx": 0,
-            "board_idx": 0,
-            "box_idx": 0,
-            "arrays_per_box": 4,
-        }
-
-    state = st.session_state["cost_packaging_state"]
-
-    # Build labels
-    frame_labels = [
-        f"{i}: {it.get('id','(no id)')} – {it.get('name','(no name)')}"
-        for i, it in enumerate(frames)
-    ]
-    board_labels = [
-        f"{i}: {it.get('id','(no id)')} – {it.get('name','(no name)')}"
-        for i, it in enumerate(boards)
-    ]
-    box_labels = [
-        f"{i}: {it.get('id','(no id)')} – {it.get('name','(no name)')} "
-        f"({it.get('diameter_mm','?')} mm diameter)"
-        for i, it in enumerate(boxes)
-    ]
+    state = st.session_state.setdefault(
+        "cost_packaging_state",
+        {"frame_idx": 0, "board_idx": 0, "box_idx": 0, "arrays_per_box": 4},
+    )
+
+    # Selects return the item index; labels are looked up for display
+    labels = _packaging_labels(file_mtime_ns(MATERIALS_FILE))
 
     # ---------------------------------------------------------
     # Frame & Board (per array)
     # ---------------------------------------------------------
     st.subheader("Frame and Board per Array")
 
-    current_frame_idx = min(state["frame_idx"], len(frame_labels) - 1)
-    frame_sel = st.selectbox(
+    current_frame_idx = min(state["frame_idx"], len(frames) - 1)
+    frame_idx = st.selectbox(
         "Select frame",
-        frame_labels,
+        range(len(frames)),
         index=current_frame_idx,
+        format_func=labels["frame"].__getitem__,
         key="cost_packaging_frame_select",
     )
-    frame_idx = int(frame_sel.split(":", 1)[0])
     state["frame_idx"] = frame_idx
     frame_item = frames[frame_idx]
-    frame_cost = get_unit_cost_gbp(frame_item, exchange_rate)
+    frame_cost = unit_costs["frame"][frame_idx]
 
-    current_board_idx = min(state["board_idx"], len(board_labels) - 1)
-    board_sel = st.selectbox(
+    current_board_idx = min(state["board_idx"], len(boards) - 1)
+    board_idx = st.selectbox(
         "Select shipping board",
-        board_labels,
+        range(len(boards)),
         index=current_board_idx,
+        format_func=labels["shipping board"].__getitem__,
         key="cost_packaging_board_select",
     )
-    board_idx = int(board_sel.split(":", 1)[0])
     state["board_idx"] = board_idx
     board_item = boards[board_idx]
-    board_cost = get_unit_cost_gbp(board_item, exchange_rate)
+    board_cost = unit_costs["shipping board"][board_idx]
 
-    st.write(
+    st.markdown(
         f"- Frame: **{frame_item.get('name','(no name)')}** "
-        f"(id: {frame_item.get('id','')}) – **£{frame_cost:.2f}** per array"
-    )
-    st.write(
+        f"(id: {frame_item.get('id','')}) – **£{frame_cost:.2f}** per array\n"
         f"- Board: **{board_item.get('name','(no name)')}** "
         f"(id: {board_item.get('id','')}) – **£{board_cost:.2f}** per array"
     )
 
     st.markdown("---")
 
-    # ---------------------------------------------------------
-    # Box + Foam (per box)
-    # ---------------------------------------------------------
-    st.subheader("Box and Foam per Box")
-
-    current_box_idx = min(state["box_idx"], len(box_labels) - 1)
-    box_sel = st.selectbox(
-        "Select box type",
-        box_labels,
-        index=current_box_idx,
-        key="cost_packaging_box_select",
-    )
-    box_idx = int(box_sel.split(":", 1)[0])
-    state["box_idx"] = box_idx
-    box_item = boxes[box_idx]
-    box_cost = get_unit_cost_gbp(box_item, exchange_rate)
-
-    arrays_per_box = st.number_input(
-        "Number of arrays per box",
-        min_value=1,
-        step=1,
-        key="cost_packaging_arrays_per_box",
-        value=int(state["arrays_per_box"]),
+    _render_box_and_totals(
+        boxes,
+        labels["box"],
+        unit_costs,
+        foam_3mm_pos,
+        foam_25mm_pos,
+        state,
+        frame_cost,
+        board_cost,
+        array_power,
+        illumination,
     )
-    state["arrays_per_box"] = arrays_per_box
-
-    # Foam usage:
-    #  - 25mm foam: 2 pieces per box (top + bottom)
-    #  - 3mm foam: (arrays_per_box - 1) pieces between arrays
-    foam_25_pieces = 2
-    foam_3_pieces = max(arrays_per_box - 1, 0)
-
-    foam_25_cost_per_piece = get_foam_cost_per_piece(foam_25mm, exchange_rate)
-    foam_3_cost_per_piece = get_foam_cost_per_piece(foam_3mm, exchange_rate)
-
-    foam_25_cost_box = foam_25_cost_per_piece * foam_25_pieces
-    foam_3_cost_box = foam_3_cost_per_piece * foam_3_pieces
-    total_foam_cost_box = foam_25_cost_box + foam_3_cost_box
-
-    st.write(
-        f"- Box: **{box_item.get('name','(no name)')}** "
-        f"(id: {box_item.get('id','')}, diameter {box_item.get('diameter_mm','?')} mm) "
-        f"– **£{box_cost:.2f}** per box"
-    )
-    st.write(
-        f"- 25mm foam pieces per box: **{foam_25_pieces}** → cost **£{foam_25_cost_box:.2f}**"
-    )
-    st.write(
-        f"- 3mm foam pieces per box: **{foam_3_pieces}** → cost **£{foam_3_cost_box:.2f}**"
-    )
-    st.write(f"- Total foam cost per box: **£{total_foam_cost_box:.2f}**")
-
-    st.markdown("---")
-
-    # ---------------------------------------------------------
-    # Total packaging cost per array
-    # ---------------------------------------------------------
-    st.subheader("Total Packaging Cost per Array")
-
-    frame_board_per_array = frame_cost + board_cost
-    shared_per_box = box_cost + total_foam_cost_box
-    shared_per_array = shared_per_box / arrays_per_box
-
-    total_packaging_per_array = frame_board_per_array + shared_per_array
-
-    st.write(f"- Frame + board per array: **£{frame_board_per_array:.2f}**")
-    st.write(
-        f"- Box + foam per array (shared): **£{shared_per_array:.2f}** "
-        f"(with {arrays_per_box} arrays per box)"
-    )
-    st.write(f"**Total packaging cost per array:** **£{total_packaging_per_array:.2f}**")
-
-    if array_power > 0:
-        cost_per_watt = total_packaging_per_array / array_power
-        st.write(
-            f"**Packaging cost per watt ({illumination}):** "
-            f"£{cost_per_watt:.5f} / W"
-        )
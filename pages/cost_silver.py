@@ -1,6 +1,15 @@
+from functools import lru_cache
+from typing import Dict, Tuple
+
 import streamlit as st
-from model import load_materials, load_array_designs, load_product, MaterialItem
-from pages.array_designs import compute_power_for_design
+from cached_loaders import cached_materials_index, file_mtime_ns
+from model import MATERIALS_FILE, MaterialItem
+from pages.array_designs import selected_design_context
+
+
+# mm (width) x mm (thickness) x 1 mm (length) = 1e-3 cm^3, so grams per mm of
+# ribbon is width_mm * thickness_mm * density_g_cm3 * this factor.
+GRAMS_PER_MM_FACTOR = 1e-3
 
 
 def get_silver_cost_per_mm(silver_item: MaterialItem, exchange_rate: float) -> float:
@@ -22,81 +31,74 @@ def get_silver_cost_per_mm(silver_item: MaterialItem, exchange_rate: float) -> f
     else:
         price_gbp = price_per_g
 
-    width_cm = width_mm / 10
-    thickness_cm = thickness_mm / 10
-    length_cm = 0.1   # 1 mm = 0.1 cm
-
-    volume_cm3 = width_cm * thickness_cm * length_cm
-    grams = volume_cm3 * density
-
-    return grams * price_gbp
-
-
-def render():
-    st.title("Silver Cost")
+    grams_per_mm = width_mm * thickness_mm * density * GRAMS_PER_MM_FACTOR
 
-    # ---------------------------------------------------------
-    # Ensure array design selected
-    # ---------------------------------------------------------
-    if "selected_array_design" not in st.session_state:
-        st.warning("Please choose an array design on the Home page.")
-        return
+    return grams_per_mm * price_gbp
 
-    selected = st.session_state["selected_array_design"]
-    illumination = st.session_state.get("selected_illumination", "AM1.5")
 
-    # Load data
-    product = load_product()
-    exchange_rate = product.exchange_rate_gbp_per_usd
-    materials = load_materials()
-    silver_items = materials.get("Silver Ribbon", [])
-    designs = load_array_designs()
-    design = next(d for d in designs if d["name"] == selected)
+@lru_cache(maxsize=8)
+def _silver_costs_per_mm(
+    materials_mtime_ns: int, exchange_rate: float
+) -> Tuple[Tuple[float, ...], Dict[str, float]]:
+    """
+    GBP per mm of every silver ribbon, by list position and by id.
 
-    if not silver_items:
-        st.error("No silver items found in Materials → Silver Ribbon.")
-        return
+    Keyed on the materials file version and exchange rate, so the pricing
+    runs once per edit; the id map follows by_id (first item wins). Treat
+    the returned dict as read-only.
+    """
+    silver = cached_materials_index()["Silver Ribbon"]
+    by_position = tuple(
+        get_silver_cost_per_mm(item, exchange_rate) for item in silver["items"]
+    )
+    by_id = {
+        item_id: get_silver_cost_per_mm(item, exchange_rate)
+        for item_id, item in silver["by_id"].items()
+    }
+    return by_position, by_id
 
-    # ---------------------------------------------------------
-    # INITIALISE STATE (ONLY ONCE)
-    # ---------------------------------------------------------
-    if "cost_silver_state" not in st.session_state:
-        st.session_state["cost_silver_state"] = {
-            "top_tab_silver_index": 0,
-            "top_tab_length_mm": 5.0,
-        }
 
-    state = st.session_state["cost_silver_state"]
+@lru_cache(maxsize=4)
+def _silver_labels(materials_mtime_ns: int) -> Tuple[str, ...]:
+    """Select labels of the silver ribbons, built once per materials version."""
+    return tuple(
+        f"{i}: {item.get('id')} – {item.get('name')} ({item.get('width_mm')} mm)"
+        for i, item in enumerate(cached_materials_index()["Silver Ribbon"]["items"])
+    )
 
-    num_cells = design["num_cells"]
-    top_tabs_count = 2 * (num_cells - 1)
 
-    # Power calc
-    power = compute_power_for_design(design)
-    if illumination == "AM1.5":
-        array_power = power["P_array_AM15_W"]
-    else:
-        array_power = power["P_array_AM0_W"]
+@st.fragment
+def _render_silver_usage(
+    silver,
+    silver_labels,
+    design,
+    state,
+    top_tabs_count,
+    cost_per_mm_at,
+    cost_per_mm_by_id,
+    array_power,
+    illumination,
+):
+    """
+    Everything below the data loading: top tabs, negative end bars, negative
+    bar and totals. Run as a fragment, so editing the tab length or silver
+    type doesn't reload the product, materials and designs.
+    """
+    silver_items = silver["items"]
 
     # ---------------------------------------------------------
     # TOP TABS
     # ---------------------------------------------------------
     st.subheader("Top Tabs")
 
-    labels = [
-        f"{i}: {item.get('id')} – {item.get('name')} ({item.get('width_mm')} mm)"
-        for i, item in enumerate(silver_items)
-    ]
-
-    sel = st.selectbox(
+    idx = st.selectbox(
         "Silver type for top tabs",
-        labels,
-        index=min(state["top_tab_silver_index"], len(labels)-1),
+        range(len(silver_items)),
+        index=min(state["top_tab_silver_index"], len(silver_items)-1),
+        format_func=silver_labels.__getitem__,
         key="cost_silver_top_tab_index",
     )
-    idx = int(sel.split(":", 1)[0])
     state["top_tab_silver_index"] = idx
-    tab_silver = silver_items[idx]
 
     tab_length_mm = st.number_input(
         "Top tab length (mm)",
@@ -107,13 +109,16 @@ def render():
     )
     state["top_tab_length_mm"] = tab_length_mm
 
-    cost_per_mm_tab = get_silver_cost_per_mm(tab_silver, exchange_rate)
+    cost_per_mm_tab = cost_per_mm_at[idx]
     total_mm_tab = top_tabs_count * tab_length_mm
     total_cost_tab = total_mm_tab * cost_per_mm_tab
 
-    st.write(f"Tabs needed: **{top_tabs_count}**")
-    st.write(f"Total length: **{total_mm_tab:.2f} mm**")
-    st.write(f"Cost: **£{total_cost_tab:.2f}**")
+    # One markdown element per section; blank lines keep them as paragraphs
+    st.markdown(
+        f"Tabs needed: **{top_tabs_count}**\n\n"
+        f"Total length: **{total_mm_tab:.2f} mm**\n\n"
+        f"Cost: **£{total_cost_tab:.2f}**"
+    )
 
     st.markdown("---")
 
@@ -123,21 +128,23 @@ def render():
     st.subheader("Negative End Bars")
 
     neg_end_id = design["negative_end_silver_id"]
-    neg_end_item = next((s for s in silver_items if s["id"] == neg_end_id), None)
+    neg_end_item = silver["by_id"].get(neg_end_id)
 
     neg_end_length = design["negative_end_length_mm"]
     neg_end_width = design["negative_end_width_mm"]
     total_mm_end = neg_end_length * 2
 
     if neg_end_item:
-        cost_end = get_silver_cost_per_mm(neg_end_item, exchange_rate) * total_mm_end
+        cost_end = cost_per_mm_by_id[neg_end_id] * total_mm_end
     else:
         st.error("Negative end silver not found in database.")
         cost_end = 0
 
-    st.write(f"Length per bar: **{neg_end_length} mm**")
-    st.write(f"Total (2 bars): **{total_mm_end} mm**")
-    st.write(f"Cost: **£{cost_end:.2f}**")
+    st.markdown(
+        f"Length per bar: **{neg_end_length} mm**\n\n"
+        f"Total (2 bars): **{total_mm_end} mm**\n\n"
+        f"Cost: **£{cost_end:.2f}**"
+    )
 
     st.markdown("---")
 
@@ -147,19 +154,21 @@ def render():
     st.subheader("Negative Bar")
 
     neg_bar_id = design["negative_bar_silver_id"]
-    neg_bar_item = next((s for s in silver_items if s["id"] == neg_bar_id), None)
+    neg_bar_item = silver["by_id"].get(neg_bar_id)
 
     neg_bar_length = design["negative_bar_length_mm"]
     neg_bar_width = design["negative_bar_width_mm"]
 
     if neg_bar_item:
-        cost_bar = get_silver_cost_per_mm(neg_bar_item, exchange_rate) * neg_bar_length
+        cost_bar = cost_per_mm_by_id[neg_bar_id] * neg_bar_length
     else:
         st.error("Negative bar silver not found in database.")
         cost_bar = 0
 
-    st.write(f"Length: **{neg_bar_length} mm**")
-    st.write(f"Cost: **£{cost_bar:.2f}**")
+    st.markdown(
+        f"Length: **{neg_bar_length} mm**\n\n"
+        f"Cost: **£{cost_bar:.2f}**"
+    )
 
     st.markdown("---")
 
@@ -170,10 +179,68 @@ def render():
     total_mm = total_mm_tab + total_mm_end + neg_bar_length
 
     st.subheader("Total Silver Usage")
-    st.write(f"Total length used: **{total_mm:.2f} mm**")
-    st.write(f"Total cost: **£{total_cost:.2f}**")
-
+    totals = [
+        f"Total length used: **{total_mm:.2f} mm**",
+        f"Total cost: **£{total_cost:.2f}**",
+    ]
     if array_power > 0:
-        st.write(
+        totals.append(
             f"Cost per W ({illumination}): **£{(total_cost/array_power):.2f} / W**"
         )
+    st.markdown("\n\n".join(totals))
+
+
+def render():
+    st.title("Silver Cost")
+
+    # ---------------------------------------------------------
+    # Ensure array design selected
+    # ---------------------------------------------------------
+    if "selected_array_design" not in st.session_state:
+        st.warning("Please choose an array design on the Home page.")
+        return
+
+    selected = st.session_state["selected_array_design"]
+    illumination = st.session_state.get("selected_illumination", "AM1.5")
+
+    # Load data
+    ctx = selected_design_context(selected, illumination)
+    if ctx is None:
+        st.error("Selected array design not found.")
+        return
+
+    design = ctx["design"]
+    exchange_rate = ctx["exchange_rate"]
+    array_power = ctx["array_power"]
+    silver = cached_materials_index()["Silver Ribbon"]
+    silver_items = silver["items"]
+    cost_per_mm_at, cost_per_mm_by_id = _silver_costs_per_mm(
+        file_mtime_ns(MATERIALS_FILE), exchange_rate
+    )
+
+    if not silver_items:
+        st.error("No silver items found in Materials → Silver Ribbon.")
+        return
+
+    # ---------------------------------------------------------
+    # INITIALISE STATE (ONLY ONCE)
+    # ---------------------------------------------------------
+    state = st.session_state.setdefault(
+        "cost_silver_state",
+        {"top_tab_silver_index": 0, "top_tab_length_mm": 5.0},
+    )
+
+    num_cells = design["num_cells"]
+    top_tabs_count = 2 * (num_cells - 1)
+
+    _render_silver_usage(
+        silver,
+        _silver_labels(file_mtime_ns(MATERIALS_FILE)),
+        design,
+        state,
+        top_tabs_count,
+        cost_per_mm_at,
+        cost_per_mm_by_id,
+        array_power,
+        illumination,
+    )
@@ -1,18 +1,22 @@
 import streamlit as st
 import pandas as pd
 
-from model import (
-    load_array_designs,
-    load_materials,
-    load_product,
+from cached_loaders import (
+    cached_foam_positions_by_thickness,
+    cached_materials,
+    cached_materials_index,
 )
-from pages.array_designs import compute_power_for_design
+from pages.array_designs import selected_design_context
 
 
 # ============================================================
 # Shared helper functions (copied from individual pages)
 # ============================================================
 
+# mm (width) x mm (thickness) x 1 mm (length) = 1e-3 cm^3 of silver
+GRAMS_PER_MM_FACTOR = 1e-3
+
+
 def get_silver_cost_per_mm(silver_item: dict, exchange_rate: float, override_width_mm: float | None = None) -> float:
     """Compute cost per mm of silver in GBP."""
     try:
@@ -34,13 +38,8 @@ def get_silver_cost_per_mm(silver_item: dict, exchange_rate: float, override_wid
     else:
         price_gbp = price_per_g
 
-    width_cm = width_mm / 10
-    thickness_cm = thickness_mm / 10
-    length_cm = 0.1  # 1 mm = 0.1 cm
-
-    volume_cm3 = width_cm * thickness_cm * length_cm
-    grams = volume_cm3 * density
-    return grams * price_gbp
+    grams_per_mm = width_mm * thickness_mm * density * GRAMS_PER_MM_FACTOR
+    return grams_per_mm * price_gbp
 
 
 def get_diode_price_gbp(diode_item: dict, exchange_rate: float) -> float:
@@ -98,6 +97,15 @@ def find_material_by_id(items: list[dict], mat_id: str | None) -> dict | None:
     return None
 
 
+def find_kapton_item(misc: dict) -> dict | None:
+    """Kapton insulation in an indexed Misc category: by id, else by type."""
+    item = misc["by_id"].get("Kapton_Insulation")
+    if item is None:
+        kaptons = misc["by_type"].get("kapton")
+        item = kaptons[0] if kaptons else None
+    return item
+
+
 def get_lamination_cost_per_m(item: dict, exchange_rate: float) -> float:
     """Lamination cost per meter (GBP)."""
     try:
@@ -313,19 +321,17 @@ def render():
     illumination = st.session_state.get("selected_illumination", "AM1.5")
 
     # Core data
-    product = load_product()
-    exchange_rate = product.exchange_rate_gbp_per_usd
-
-    designs = load_array_designs()
-    design = next((d for d in designs if d["name"] == selected_name), None)
-    if design is None:
+    ctx = selected_design_context(selected_name, illumination)
+    if ctx is None:
         st.error("Selected array design not found.")
         return
 
-    materials = load_materials()
+    design = ctx["design"]
+    exchange_rate = ctx["exchange_rate"]
+    array_power = ctx["array_power"]
 
-    power = compute_power_for_design(design)
-    array_power = power["P_array_AM15_W"] if illumination == "AM1.5" else power["P_array_AM0_W"]
+    materials = cached_materials()
+    materials_index = cached_materials_index()
 
     num_cells = int(design.get("num_cells", 0))
     if num_cells <= 0:
@@ -590,11 +596,7 @@ def render():
         )
 
         # Kapton
-        kapton_item = None
-        for it in misc_items:
-            if str(it.get("id", "")) == "Kapton_Insulation" or str(it.get("type", "")).lower() == "kapton":
-                kapton_item = it
-                break
+        kapton_item = find_kapton_item(materials_index["Misc"])
 
         kapton_cost = 0.0
         if kapton_item:
@@ -603,7 +605,7 @@ def render():
             kapton_cost = cost_per_disk * disks_per_array
 
         # Epoxy
-        epoxy_items = [it for it in misc_items if str(it.get("type", "")).lower() == "epoxy"]
+        epoxy_items = materials_index["Misc"]["by_type"].get("epoxy", [])
         epoxy_cost = 0.0
         if epoxy_items:
             epoxy_idx = min(misc_state["epoxy_index"], len(epoxy_items) - 1)
@@ -633,23 +635,18 @@ def render():
             },
         )
 
-        frames = [it for it in packaging_items if str(it.get("type", "")).lower() == "frame"]
-        boards = [it for it in packaging_items if str(it.get("type", "")).lower() == "shipping board"]
-        foams = [it for it in packaging_items if str(it.get("type", "")).lower() == "foam"]
-        boxes = [it for it in packaging_items if str(it.get("type", "")).lower() == "box"]
+        packaging_by_type = materials_index["Packaging"]["by_type"]
+        frames = packaging_by_type.get("frame", [])
+        boards = packaging_by_type.get("shipping board", [])
+        foams = packaging_by_type.get("foam", [])
+        boxes = packaging_by_type.get("box", [])
 
         if frames and boards and foams and boxes:
-            foam_3mm = None
-            foam_25mm = None
-            for f in foams:
-                try:
-                    th = float(f.get("thickness_mm", 0.0))
-                except (TypeError, ValueError):
-                    th = 0.0
-                if abs(th - 3.0) < 1e-3:
-                    foam_3mm = f
-                elif abs(th - 25.0) < 1e-3:
-                    foam_25mm = f
+            foam_positions = cached_foam_positions_by_thickness()
+            foam_3mm_pos = foam_positions.get(3.0)
+            foam_25mm_pos = foam_positions.get(25.0)
+            foam_3mm = None if foam_3mm_pos is None else foams[foam_3mm_pos]
+            foam_25mm = None if foam_25mm_pos is None else foams[foam_25mm_pos]
 
             if foam_3mm and foam_25mm:
                 frame_idx = min(pack_state["frame_idx"], len(frames) - 1)
@@ -1,6 +1,6 @@
 import streamlit as st
 
-from model import load_array_designs, load_materials, load_product
+from cached_loaders import cached_array_designs, cached_materials, cached_product
 from pages.array_designs import compute_power_for_design
 
 
@@ -54,17 +54,17 @@ def render():
     # ---------------------------------------------------------
     # Load product, array design, materials
     # ---------------------------------------------------------
-    product = load_product()
+    product = cached_product()
     exchange_rate = product.exchange_rate_gbp_per_usd
 
-    designs = load_array_designs()
+    designs = cached_array_designs()
     design = next((d for d in designs if d["name"] == selected_name), None)
 
     if design is None:
         st.error("Selected array design not found.")
         return
 
-    materials = load_materials()
+    materials = cached_materials()
     weld_items = materials.get("Weld heads", [])
 
     if not weld_items:
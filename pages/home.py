@@ -3,12 +3,16 @@ from math import ceil
 
 import streamlit as st
 
-from model import load_array_designs, load_materials
+from cached_loaders import (
+    cached_array_designs,
+    cached_foam_positions_by_thickness,
+    cached_materials,
+    cached_materials_index,
+    cached_operator_profiles,
+    cached_process_steps,
+)
 from pages.array_designs import compute_power_for_design
 
-# NEW: import labour helpers
-from labour_model import load_process_steps, load_operator_profiles
-
 # Folder for design images (e.g. images/11_cell.png)
 IMAGE_FOLDER = "images"
 
@@ -399,35 +403,19 @@ def _render_material_requirements_expander(
                 },
             )
 
-            frames = [
-                it for it in packaging_items
-                if str(it.get("type", "")).lower() == "frame"
-            ]
-            boards = [
-                it for it in packaging_items
-                if str(it.get("type", "")).lower() == "shipping board"
-            ]
-            foams = [
-                it for it in packaging_items
-                if str(it.get("type", "")).lower() == "foam"
-            ]
-            boxes = [
-                it for it in packaging_items
-                if str(it.get("type", "")).lower() == "box"
-            ]
+            # Items by lower-cased type, grouped once per materials version
+            packaging_by_type = cached_materials_index()["Packaging"]["by_type"]
+            frames = packaging_by_type.get("frame", [])
+            boards = packaging_by_type.get("shipping board", [])
+            foams = packaging_by_type.get("foam", [])
+            boxes = packaging_by_type.get("box", [])
 
             if frames and boards and foams and boxes:
-                foam_3mm = None
-                foam_25mm = None
-                for f in foams:
-                    try:
-                        th = float(f.get("thickness_mm", 0.0))
-                    except (TypeError, ValueError):
-                        th = 0.0
-                    if abs(th - 3.0) < 1e-3:
-                        foam_3mm = f
-                    elif abs(th - 25.0) < 1e-3:
-                        foam_25mm = f
+                foam_positions = cached_foam_positions_by_thickness()
+                foam_3mm_pos = foam_positions.get(3.0)
+                foam_25mm_pos = foam_positions.get(25.0)
+                foam_3mm = None if foam_3mm_pos is None else foams[foam_3mm_pos]
+                foam_25mm = None if foam_25mm_pos is None else foams[foam_25mm_pos]
 
                 if foam_3mm and foam_25mm:
                     frame_idx = min(pack_state["frame_idx"], len(frames) - 1)
@@ -507,8 +495,8 @@ def _compute_labour_per_array(num_cells: int) -> tuple[float, float]:
         return 0.0, 0.0
 
     try:
-        steps = load_process_steps()
-        operators = load_operator_profiles()
+        steps = cached_process_steps()
+        operators = cached_operator_profiles()
     except Exception:
         return 0.0, 0.0
 
@@ -616,7 +604,7 @@ def render():
     # -----------------------------------------------------------
     # Load designs & materials
     # -----------------------------------------------------------
-    designs = load_array_designs()
+    designs = cached_array_designs()
 
     if not designs:
         st.warning(
@@ -624,7 +612,7 @@ def render():
         )
         return
 
-    materials = load_materials()
+    materials = cached_materials()
     design_names = [d["name"] for d in designs]
 
     # -----------------------------------------------------------
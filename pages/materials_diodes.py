@@ -1,3 +1,5 @@
+import copy
+
 import streamlit as st
 
 from model import load_materials, save_materials, MaterialItem
@@ -7,7 +9,7 @@ def render() -> None:
     """CRUD page for Diodes — very simple unit pricing."""
     st.title("Diodes")
 
-    materials_db = load_materials()
+    materials_db = copy.deepcopy(load_materials())
     diodes = materials_db.get("Diodes", [])
 
     # ------------------ LIST ITEMS ------------------
@@ -1,3 +1,5 @@
+import copy
+
 import streamlit as st
 
 from model import load_materials, save_materials, load_product, MaterialItem
@@ -83,7 +85,7 @@ def render() -> None:
         """
     )
 
-    materials_db = load_materials()
+    materials_db = copy.deepcopy(load_materials())
     misc_items = materials_db.get("Misc", [])
 
     # ------------------ TABLE DISPLAY ------------------
@@ -1,3 +1,5 @@
+import copy
+
 import streamlit as st
 
 from model import load_materials, save_materials, load_product, MaterialItem
@@ -78,7 +80,7 @@ def render() -> None:
         """
     )
 
-    materials_db = load_materials()
+    materials_db = copy.deepcopy(load_materials())
     packaging_items = materials_db.get("Packaging", [])
 
     # ------------------ TABLE DISPLAY ------------------
@@ -1,3 +1,5 @@
+import copy
+
 import streamlit as st
 
 from model import (
@@ -72,7 +74,7 @@ def render() -> None:
         """
     )
 
-    materials_db = load_materials()
+    materials_db = copy.deepcopy(load_materials())
     silver_items = materials_db.get("Silver Ribbon", [])
 
     # ------------------ LIST ITEMS ------------------
@@ -1,3 +1,5 @@
+import copy
+
 import streamlit as st
 
 from model import load_materials, save_materials, load_product, MaterialItem
@@ -65,7 +67,7 @@ def render() -> None:
         """
     )
 
-    materials_db = load_materials()
+    materials_db = copy.deepcopy(load_materials())
     weld_heads = materials_db.get("Weld heads", [])
 
     # ------------------ LIST ITEMS ------------------
@@ -0,0 +1,57 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import yaml
+from streamlit.testing.v1 import AppTest
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+class LabourSaveRoundTripTest(unittest.TestCase):
+    """Saving process timings must not drop step keys the form doesn't edit."""
+
+    def setUp(self):
+        # The page writes process.yaml, so run it on a throwaway copy
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        self.root = Path(tmp) / "app"
+        shutil.copytree(
+            REPO,
+            self.root,
+            ignore=shutil.ignore_patterns(".git", "__pycache__", ".cache", "tests"),
+        )
+
+    def _load_steps(self):
+        with open(self.root / "process.yaml", encoding="utf-8") as f:
+            return yaml.safe_load(f)["process"]
+
+    def test_save_keeps_unedited_keys(self):
+        before = self._load_steps()
+
+        at = AppTest.from_file(str(self.root / "app.py"), default_timeout=60)
+        at.run()
+        at.sidebar.radio[0].set_value("Labour").run()
+
+        # Open the first step for editing, rename it and save
+        step_id = before[0]["id"]
+        at.button(key=f"edit_{step_id}").click().run()
+        at.text_input(key=f"name_{step_id}").set_value("Renamed step").run()
+        next(b for b in at.button if b.label == "Save process timings").click().run()
+        self.assertFalse(at.exception, at.exception)
+
+        after = self._load_steps()
+        self.assertEqual(len(after), len(before))
+        self.assertEqual(after[0]["name"], "Renamed step")
+
+        # Opened and unopened steps alike keep every key they were loaded with
+        for old, new in zip(before, after):
+            for key in ("machine_time_share", "batch_size", "items_per_array"):
+                if key in old:
+                    self.assertEqual(new.get(key), old[key], (old["id"], key))
+            self.assertLessEqual(set(old), set(new), old["id"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+import functools
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+# orjson is optional; without it (or for documents JSON can't represent
+# exactly) the sidecars are pickles.
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+@functools.lru_cache(maxsize=1)
+def _yaml_backend() -> Tuple[Any, Any, Any]:
+    """
+    Import PyYAML on first use and return (yaml, Loader, Dumper).
+
+    Deferred so a process that only ever hits the in-memory cache or the
+    pickle sidecars never pays the yaml/libyaml import. Prefers the
+    libyaml-backed C classes; falls back to pure Python if PyYAML was built
+    without libyaml.
+    """
+    import yaml
+
+    try:
+        from yaml import CSafeDumper as Dumper, CSafeLoader as Loader
+    except ImportError:  # pragma: no cover - depends on the PyYAML build
+        from yaml import SafeDumper as Dumper, SafeLoader as Loader
+    return yaml, Loader, Dumper
+
+# -----------------------------------------------------------------------------
+# In-process YAML cache
+# -----------------------------------------------------------------------------
+# Streamlit reruns the whole script on every widget interaction, so the
+# loaders in model.py / labour_model.py are hit constantly. Parsing is the
+# expensive part; here we keep the parsed document per path and only re-read
+# it when the file's (mtime, size, inode) signature changes on disk.
+
+#
+# On a cold process the parsed document also comes from a sidecar in
+# data/.cache/ (orjson when available, else pickle), which is regenerated
+# whenever the YAML's signature changes. The YAML file stays the single
+# source of truth.
+
+_Signature = Tuple[int, int, int]
+
+_CACHE: Dict[Path, Tuple[_Signature, Any]] = {}
+_LOCK = threading.Lock()
+
+SIDECAR_DIR = Path(__file__).parent / "data" / ".cache"
+
+
+def file_signature(path: Path) -> _Signature:
+    """(mtime_ns, size, inode) of a file; changes whenever it is rewritten."""
+    st = path.stat()
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _sidecar_path(path: Path) -> Path:
+    return SIDECAR_DIR / (path.name + ".pkl")
+
+
+def _json_sidecar_path(path: Path) -> Path:
+    return SIDECAR_DIR / (path.name + ".json")
+
+
+def _read_sidecar(path: Path, sig: _Signature) -> Tuple[bool, Any]:
+    """Return (True, data) if a sidecar for exactly this YAML version exists."""
+    if orjson is not None:
+        try:
+            blob = orjson.loads(_json_sidecar_path(path).read_bytes())
+            if tuple(blob["sig"]) == sig:
+                return True, blob["data"]
+        except Exception:
+            pass
+
+    try:
+        with _sidecar_path(path).open("rb") as f:
+            side_sig, data = pickle.load(f)
+    except Exception:
+        return False, None
+    if side_sig != sig:
+        return False, None
+    return True, data
+
+
+def _json_sidecar_payload(sig: _Signature, data: Any):
+    """orjson bytes for the sidecar, or None if JSON can't hold `data` exactly."""
+    if orjson is None:
+        return None
+    try:
+        payload = orjson.dumps({"sig": sig, "data": data})
+    except TypeError:  # e.g. dates or non-str keys
+        return None
+    # NaN/inf become null and tuples become lists; only trust a clean round trip
+    if orjson.loads(payload)["data"] != data:
+        return None
+    return payload
+
+
+def _write_sidecar(path: Path, sig: _Signature, data: Any) -> None:
+    """Best effort: a missing or unwritable cache dir just means no sidecar."""
+    payload = _json_sidecar_payload(sig, data)
+    if payload is not None:
+        side = _json_sidecar_path(path)
+    else:
+        payload = pickle.dumps((sig, data), protocol=pickle.HIGHEST_PROTOCOL)
+        side = _sidecar_path(path)
+
+    tmp = side.with_suffix(side.suffix + ".tmp")
+    try:
+        SIDECAR_DIR.mkdir(parents=True, exist_ok=True)
+        with tmp.open("wb") as f:
+            f.write(payload)
+        os.replace(tmp, side)
+    except OSError:
+        pass
+
+
+def _remove_sidecar(path: Path) -> None:
+    for side in (_json_sidecar_path(path), _sidecar_path(path)):
+        try:
+            side.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def load_yaml_cached(path: Path) -> Any:
+    """
+    Parse a YAML file, reusing the previous result if the file is unchanged.
+
+    The returned object IS the cached one and must be treated as read-only;
+    callers that want to edit it should copy.deepcopy() it first.
+    May return None for an empty file, exactly like yaml.safe_load.
+    """
+    sig = file_signature(path)
+
+    with _LOCK:
+        hit = _CACHE.get(path)
+        if hit is not None and hit[0] == sig:
+            return hit[1]
+
+        found, data = _read_sidecar(path, sig)
+        if not found:
+            yaml, loader, _ = _yaml_backend()
+            with path.open("r", encoding="utf-8") as f:
+                data = yaml.load(f, Loader=loader)
+            _write_sidecar(path, sig, data)
+
+        _CACHE[path] = (sig, data)
+        return data
+
+
+def invalidate_yaml_cache(path: Path) -> None:
+    """Drop the cached entry and sidecar for a path (call after writing it)."""
+    with _LOCK:
+        _CACHE.pop(path, None)
+        _remove_sidecar(path)
+
+
+# -----------------------------------------------------------------------------
+# Writing
+# -----------------------------------------------------------------------------
+
+def write_yaml_if_changed(path: Path, data: Any) -> bool:
+    """
+    Dump `data` to `path` unless the file already holds exactly that YAML.
+
+    The whole document is serialised in memory first, then written to a
+    temporary file in a single write(), fsync'd and moved into place with
+    os.replace, so readers never see a half-written file (and the new inode
+    changes the cache signature). Returns True if the file was (re)written.
+    """
+    yaml, _, dumper = _yaml_backend()
+    text = yaml.dump(data, Dumper=dumper, sort_keys=False)
+
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            if f.read() == text:
+                return False
+    except FileNotFoundError:
+        pass
+
+    # Same bytes a text-mode write would produce on this platform
+    payload = text.replace("\n", os.linesep).encode("utf-8")
+
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+    invalidate_yaml_cache(path)
+    return True